@@ -21,7 +21,8 @@ from .logging_config import setup_logging, get_logger, LogContext
 from .resources import ManagedResource, ResourcePool, register_cleanup, cleanup_all
 from .singleton import ThreadSafeSingleton, LazySingleton, ReadWriteLock, AtomicCounter
 from .features import (
-    Feature, FeatureManager, register_feature, feature_available, execute_feature,
+    Feature, FeatureManager, register_feature, register_features, feature_available,
+    execute_feature,
 )
 
 __all__ = [
@@ -44,5 +45,6 @@ __all__ = [
     # Singletons
     "ThreadSafeSingleton", "LazySingleton", "ReadWriteLock", "AtomicCounter",
     # Features
-    "Feature", "FeatureManager", "register_feature", "feature_available", "execute_feature",
+    "Feature", "FeatureManager", "register_feature", "register_features",
+    "feature_available", "execute_feature",
 ]
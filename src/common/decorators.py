@@ -8,7 +8,11 @@ from __future__ import annotations
 
 import functools
 import logging
+import operator
+import os
+import random
 import time
+import warnings
 from typing import Type, Tuple, Callable, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -38,19 +42,20 @@ def handle_errors(
     """
     if not exception_types:
         exception_types = (Exception,)
+    exc_info = log_level >= logging.ERROR
 
     def decorator(func: Callable) -> Callable:
+        prefix = message or f"{func.__name__} failed"
+
+        # The success path only touches func; everything the except clause
+        # needs is resolved here, once per decorated function.
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except exception_types as e:
-                prefix = message or f"{func.__name__} failed"
-                logger.log(
-                    log_level,
-                    f"{prefix}: {e}",
-                    exc_info=log_level >= logging.ERROR,
-                )
+                if logger.isEnabledFor(log_level):
+                    logger.log(log_level, "%s: %s", prefix, e, exc_info=exc_info)
                 if reraise:
                     raise
                 return default
@@ -64,27 +69,42 @@ def retry(
     backoff: float = 2.0,
     exceptions: Tuple[Type[Exception], ...] = (Exception,),
     on_retry: Optional[Callable[[Exception, int], None]] = None,
+    jitter: bool = True,
+    max_delay: float = 60.0,
 ):
     """
     Decorator to retry failed operations with exponential backoff.
 
+    With jitter enabled, each sleep is drawn uniformly from
+    [0, min(current_delay, max_delay)] ("full jitter"), so concurrent
+    callers failing together do not retry in lockstep.
+
     Args:
         max_attempts: Maximum number of attempts
         delay: Initial delay between retries (seconds)
         backoff: Multiplier for delay after each retry
         exceptions: Exception types to catch and retry
         on_retry: Callback called on each retry with (exception, attempt)
+        jitter: Randomize each sleep between zero and the backoff ceiling
+        max_delay: Upper bound on any single sleep (seconds)
     
     Example:
         @retry(max_attempts=3, delay=0.5, exceptions=(ConnectionError,))
         def connect_to_server():
             ...
     """
+    # Backoff ceilings are fixed at decoration time; jitter is applied per sleep
+    ceilings = []
+    current_delay = delay
+    for _ in range(max_attempts - 1):
+        ceilings.append(min(current_delay, max_delay))
+        current_delay *= backoff
+    delays = tuple(ceilings)
+
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             last_exception = None
-            current_delay = delay
 
             for attempt in range(max_attempts):
                 try:
@@ -93,16 +113,18 @@ def retry(
                     last_exception = e
                     if attempt < max_attempts - 1:
                         logger.warning(
-                            f"{func.__name__} failed (attempt {attempt + 1}/{max_attempts}): {e}"
+                            "%s failed (attempt %d/%d): %s",
+                            func.__name__, attempt + 1, max_attempts, e,
                         )
                         if on_retry:
                             on_retry(e, attempt + 1)
-                        time.sleep(current_delay)
-                        current_delay *= backoff
+                        cap = delays[attempt]
+                        time.sleep(random.uniform(0, cap) if jitter else cap)
 
             # All attempts exhausted
             logger.error(
-                f"{func.__name__} failed after {max_attempts} attempts: {last_exception}"
+                "%s failed after %d attempts: %s",
+                func.__name__, max_attempts, last_exception,
             )
             raise last_exception
 
@@ -122,10 +144,15 @@ def ensure_connected(connection_attr: str = "_connection"):
         def execute_query(self, sql):
             ...
     """
+    get_connection = operator.attrgetter(connection_attr)
+
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(self, *args, **kwargs):
-            conn = getattr(self, connection_attr, None)
+            try:
+                conn = get_connection(self)
+            except AttributeError:
+                conn = None
             if conn is None:
                 raise RuntimeError(
                     f"Connection not established. Call connect() before {func.__name__}()"
@@ -144,28 +171,36 @@ def deprecated(message: str = "", version: str = ""):
         version: Version when deprecated
     """
     def decorator(func: Callable) -> Callable:
+        warning_msg = f"{func.__name__} is deprecated"
+        if version:
+            warning_msg += f" since version {version}"
+        if message:
+            warning_msg += f": {message}"
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            import warnings
-            warning_msg = f"{func.__name__} is deprecated"
-            if version:
-                warning_msg += f" since version {version}"
-            if message:
-                warning_msg += f": {message}"
             warnings.warn(warning_msg, DeprecationWarning, stacklevel=2)
             return func(*args, **kwargs)
         return wrapper
     return decorator
 
 
+@functools.cache
+def _is_root() -> bool:
+    """Whether the process runs as root (cached; see require_root.invalidate)."""
+    return os.geteuid() == 0
+
+
 def require_root(func: Callable) -> Callable:
     """
     Decorator that requires root/sudo privileges.
+
+    The effective UID is checked once per process. Call
+    ``require_root.invalidate()`` after changing it (e.g. via setuid()).
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        import os
-        if os.geteuid() != 0:
+        if not _is_root():
             raise PermissionError(
                 f"{func.__name__} requires root privileges. Run with sudo."
             )
@@ -173,16 +208,26 @@ def require_root(func: Callable) -> Callable:
     return wrapper
 
 
+require_root.invalidate = _is_root.cache_clear
+
+
 def timed(func: Callable) -> Callable:
     """
     Decorator to log function execution time.
+
+    Timing is skipped entirely when DEBUG logging is disabled.
     """
+    enabled = logger.isEnabledFor
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        if not enabled(logging.DEBUG):
+            return func(*args, **kwargs)
         start = time.perf_counter()
         try:
             return func(*args, **kwargs)
         finally:
-            elapsed = time.perf_counter() - start
-            logger.debug(f"{func.__name__} completed in {elapsed:.3f}s")
+            logger.debug(
+                "%s completed in %.3fs", func.__name__, time.perf_counter() - start
+            )
     return wrapper
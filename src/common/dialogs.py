@@ -6,6 +6,7 @@ Provides standardized GTK4/Adwaita dialogs for consistent UX.
 
 from __future__ import annotations
 
+import threading
 from typing import Callable, Optional
 
 try:
@@ -134,6 +135,8 @@ def show_progress(
 
 class ProgressDialog:
     """Progress dialog for long operations."""
+
+    _PCT_TABLE = tuple(f"{i}%" for i in range(101))
     
     def __init__(
         self,
@@ -176,6 +179,16 @@ class ProgressDialog:
         
         self._window.set_content(box)
         self._window.present()
+
+        # Updates are coalesced: producers only record the latest state and
+        # at most one idle callback is queued to render it. Calls made on the
+        # GTK main thread (the one constructing the dialog) render directly.
+        self._main_thread = threading.get_ident()
+        self._lock = threading.Lock()
+        self._pending_fraction: Optional[float] = None
+        self._pending_pulse = False
+        self._pending_message: Optional[str] = None
+        self._scheduled = False
     
     def update_progress(self, fraction: float, message: Optional[str] = None):
         """
@@ -185,27 +198,61 @@ class ProgressDialog:
             fraction: Progress from 0.0 to 1.0
             message: Optional new message
         """
-        def _update():
-            self._progress_bar.set_fraction(fraction)
-            self._progress_bar.set_text(f"{int(fraction * 100)}%")
+        with self._lock:
+            self._pending_fraction = fraction
+            self._pending_pulse = False
             if message:
-                self._message_label.set_text(message)
-            return False
-        
-        GLib.idle_add(_update)
+                self._pending_message = message
+        self._request_flush()
     
     def pulse(self, message: Optional[str] = None):
         """Show indeterminate progress."""
-        def _pulse():
-            self._progress_bar.pulse()
+        with self._lock:
+            self._pending_fraction = None
+            self._pending_pulse = True
             if message:
-                self._message_label.set_text(message)
-            return False
-        
-        GLib.idle_add(_pulse)
+                self._pending_message = message
+        self._request_flush()
+
+    def _request_flush(self):
+        """Render the pending state now if on the main thread, else queue it."""
+        if threading.get_ident() == self._main_thread:
+            self._flush()
+            return
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        GLib.idle_add(self._flush)
+
+    def _flush(self):
+        """Render the latest pending state on the GTK main loop."""
+        with self._lock:
+            fraction = self._pending_fraction
+            pulse = self._pending_pulse
+            message = self._pending_message
+            self._pending_fraction = None
+            self._pending_pulse = False
+            self._pending_message = None
+            self._scheduled = False
+
+        if fraction is not None:
+            self._progress_bar.set_fraction(fraction)
+            self._progress_bar.set_text(
+                self._PCT_TABLE[min(100, max(0, int(fraction * 100)))]
+            )
+        elif pulse:
+            self._progress_bar.pulse()
+        if message:
+            self._message_label.set_text(message)
+        return False
     
     def close(self):
         """Close the progress dialog."""
+        if threading.get_ident() == self._main_thread:
+            self._window.close()
+            return
+
         def _close():
             self._window.close()
             return False
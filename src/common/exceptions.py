@@ -5,6 +5,7 @@ Provides clear, actionable error messages with structured information
 for logging, user feedback, and programmatic error handling.
 """
 
+import sys
 from typing import Optional, Dict, Any
 
 
@@ -20,6 +21,16 @@ class NeuronError(Exception):
         recoverable: Whether the error is recoverable
     """
 
+    __slots__ = ("message", "_details", "cause", "recoverable")
+
+    # Machine-readable code shared by all instances of a class. Subclasses
+    # set their own; those that don't default to their class name.
+    code: str = "NeuronError"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.code = sys.intern(cls.__dict__.get("code") or cls.__name__)
+
     def __init__(
         self,
         message: str,
@@ -30,15 +41,28 @@ class NeuronError(Exception):
     ):
         super().__init__(message)
         self.message = message
-        self.code = code or self.__class__.__name__
-        self.details = details or {}
+        if code:
+            self.code = sys.intern(code)
+        # Errors raised without details only get a dict once one is used
+        self._details = details
         self.cause = cause
         self.recoverable = recoverable
 
+    @property
+    def details(self) -> Dict[str, Any]:
+        """Additional context as key-value pairs."""
+        if self._details is None:
+            self._details = {}
+        return self._details
+
+    @details.setter
+    def details(self, details: Dict[str, Any]) -> None:
+        self._details = details
+
     def __str__(self):
         s = f"[{self.code}] {self.message}"
-        if self.details:
-            s += f" (details: {self.details})"
+        if self._details:
+            s += f" (details: {self._details})"
         if self.cause:
             s += f" caused by: {self.cause}"
         return s
@@ -59,15 +83,17 @@ class NeuronError(Exception):
 
 class VMError(NeuronError):
     """Base for VM-related errors."""
-    pass
+    __slots__ = ()
 
 
 class VMNotFoundError(VMError):
     """VM does not exist."""
+    __slots__ = ()
+    code = "VM_NOT_FOUND"
+
     def __init__(self, vm_name: str):
         super().__init__(
             f"Virtual machine '{vm_name}' not found",
-            code="VM_NOT_FOUND",
             details={"vm_name": vm_name},
             recoverable=False,
         )
@@ -75,40 +101,48 @@ class VMNotFoundError(VMError):
 
 class VMStartError(VMError):
     """Failed to start VM."""
+    __slots__ = ()
+    code = "VM_START_FAILED"
+
     def __init__(self, vm_name: str, reason: str):
         super().__init__(
             f"Failed to start VM '{vm_name}': {reason}",
-            code="VM_START_FAILED",
             details={"vm_name": vm_name, "reason": reason},
         )
 
 
 class VMStopError(VMError):
     """Failed to stop VM."""
+    __slots__ = ()
+    code = "VM_STOP_FAILED"
+
     def __init__(self, vm_name: str, reason: str):
         super().__init__(
             f"Failed to stop VM '{vm_name}': {reason}",
-            code="VM_STOP_FAILED",
             details={"vm_name": vm_name, "reason": reason},
         )
 
 
 class VMCreationError(VMError):
     """Failed to create VM."""
+    __slots__ = ()
+    code = "VM_CREATION_FAILED"
+
     def __init__(self, message: str, cause: Optional[Exception] = None):
         super().__init__(
             message,
-            code="VM_CREATION_FAILED",
             cause=cause,
         )
 
 
 class VMStateError(VMError):
     """Invalid VM state for operation."""
+    __slots__ = ()
+    code = "VM_INVALID_STATE"
+
     def __init__(self, vm_name: str, current_state: str, required_state: str):
         super().__init__(
             f"VM '{vm_name}' is in state '{current_state}', requires '{required_state}'",
-            code="VM_INVALID_STATE",
             details={
                 "vm_name": vm_name,
                 "current_state": current_state,
@@ -123,25 +157,29 @@ class VMStateError(VMError):
 
 class HardwareError(NeuronError):
     """Base for hardware-related errors."""
-    pass
+    __slots__ = ()
 
 
 class GPUNotFoundError(HardwareError):
     """No suitable GPU found for passthrough."""
+    __slots__ = ()
+    code = "GPU_NOT_FOUND"
+
     def __init__(self, reason: str = "No discrete GPU available"):
         super().__init__(
             reason,
-            code="GPU_NOT_FOUND",
             recoverable=False,
         )
 
 
 class IOMMUError(HardwareError):
     """IOMMU not properly configured."""
+    __slots__ = ()
+    code = "IOMMU_ERROR"
+
     def __init__(self, message: str = "IOMMU not enabled"):
         super().__init__(
             f"{message}. Enable IOMMU in BIOS and add kernel parameters.",
-            code="IOMMU_ERROR",
             details={
                 "intel_param": "intel_iommu=on iommu=pt",
                 "amd_param": "amd_iommu=on iommu=pt",
@@ -152,10 +190,12 @@ class IOMMUError(HardwareError):
 
 class VFIOError(HardwareError):
     """VFIO binding failed."""
+    __slots__ = ()
+    code = "VFIO_BIND_FAILED"
+
     def __init__(self, pci_address: str, reason: str):
         super().__init__(
             f"Failed to bind {pci_address} to VFIO: {reason}",
-            code="VFIO_BIND_FAILED",
             details={"pci_address": pci_address, "reason": reason},
         )
 
@@ -166,35 +206,41 @@ class VFIOError(HardwareError):
 
 class InstallError(NeuronError):
     """Base for installation errors."""
-    pass
+    __slots__ = ()
 
 
 class DependencyError(InstallError):
     """Missing dependency."""
+    __slots__ = ()
+    code = "MISSING_DEPENDENCY"
+
     def __init__(self, dependency: str, package: Optional[str] = None):
         super().__init__(
             f"Missing dependency: {dependency}",
-            code="MISSING_DEPENDENCY",
             details={"dependency": dependency, "package": package},
         )
 
 
 class DownloadError(InstallError):
     """Download failed."""
+    __slots__ = ()
+    code = "DOWNLOAD_FAILED"
+
     def __init__(self, url: str, reason: str):
         super().__init__(
             f"Failed to download: {reason}",
-            code="DOWNLOAD_FAILED",
             details={"url": url, "reason": reason},
         )
 
 
 class ChecksumError(InstallError):
     """Checksum verification failed."""
+    __slots__ = ()
+    code = "CHECKSUM_MISMATCH"
+
     def __init__(self, filename: str, expected: str, actual: str):
         super().__init__(
             f"Checksum mismatch for {filename}",
-            code="CHECKSUM_MISMATCH",
             details={
                 "filename": filename,
                 "expected": expected,
@@ -210,15 +256,17 @@ class ChecksumError(InstallError):
 
 class ConnectionError(NeuronError):
     """Base for connection-related errors."""
-    pass
+    __slots__ = ()
 
 
 class LibvirtConnectionError(ConnectionError):
     """Failed to connect to libvirt."""
+    __slots__ = ()
+    code = "LIBVIRT_CONNECTION_FAILED"
+
     def __init__(self, uri: str, cause: Optional[Exception] = None):
         super().__init__(
             f"Cannot connect to libvirt at {uri}",
-            code="LIBVIRT_CONNECTION_FAILED",
             details={"uri": uri},
             cause=cause,
         )
@@ -226,10 +274,12 @@ class LibvirtConnectionError(ConnectionError):
 
 class GuestAgentConnectionError(ConnectionError):
     """Failed to connect to guest agent."""
+    __slots__ = ()
+    code = "GUEST_AGENT_UNAVAILABLE"
+
     def __init__(self, vm_name: str):
         super().__init__(
             f"Cannot connect to guest agent in VM '{vm_name}'",
-            code="GUEST_AGENT_UNAVAILABLE",
             details={"vm_name": vm_name},
         )
 
@@ -240,25 +290,29 @@ class GuestAgentConnectionError(ConnectionError):
 
 class ConfigError(NeuronError):
     """Base for configuration errors."""
-    pass
+    __slots__ = ()
 
 
 class InvalidConfigError(ConfigError):
     """Invalid configuration."""
+    __slots__ = ()
+    code = "INVALID_CONFIG"
+
     def __init__(self, field: str, value: Any, reason: str):
         super().__init__(
             f"Invalid configuration: {field}={value}: {reason}",
-            code="INVALID_CONFIG",
             details={"field": field, "value": str(value), "reason": reason},
         )
 
 
 class MissingConfigError(ConfigError):
     """Required configuration missing."""
+    __slots__ = ()
+    code = "MISSING_CONFIG"
+
     def __init__(self, field: str):
         super().__init__(
             f"Missing required configuration: {field}",
-            code="MISSING_CONFIG",
             details={"field": field},
         )
 
@@ -269,10 +323,12 @@ class MissingConfigError(ConfigError):
 
 class PermissionError(NeuronError):
     """Permission denied."""
+    __slots__ = ()
+    code = "PERMISSION_DENIED"
+
     def __init__(self, resource: str, operation: str):
         super().__init__(
             f"Permission denied: {operation} on {resource}",
-            code="PERMISSION_DENIED",
             details={"resource": resource, "operation": operation},
         )
 
@@ -283,24 +339,28 @@ class PermissionError(NeuronError):
 
 class TemplateError(NeuronError):
     """Template-related errors."""
-    pass
+    __slots__ = ()
 
 
 class TemplateNotFoundError(TemplateError):
     """Template not found."""
+    __slots__ = ()
+    code = "TEMPLATE_NOT_FOUND"
+
     def __init__(self, template_name: str):
         super().__init__(
             f"Template not found: {template_name}",
-            code="TEMPLATE_NOT_FOUND",
             details={"template": template_name},
         )
 
 
 class TemplateRenderError(TemplateError):
     """Template rendering failed."""
+    __slots__ = ()
+    code = "TEMPLATE_RENDER_FAILED"
+
     def __init__(self, template_name: str, reason: str):
         super().__init__(
             f"Failed to render template '{template_name}': {reason}",
-            code="TEMPLATE_RENDER_FAILED",
             details={"template": template_name, "reason": reason},
         )
@@ -6,12 +6,16 @@ Provides fallback behavior when features are unavailable.
 
 from __future__ import annotations
 
+import functools
 import logging
 from dataclasses import dataclass
-from typing import Optional, Callable, Any, Dict
+from typing import Optional, Callable, Any, Dict, Iterable, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Marks a missing cache entry (cached values are themselves falsy)
+_UNSET = object()
+
 
 @dataclass
 class Feature:
@@ -54,12 +58,75 @@ class FeatureManager:
     def __init__(self):
         self._features: Dict[str, Feature] = {}
         self._availability_cache: Dict[str, bool] = {}
+        # name -> primary/fallback callable; invalidated with the availability cache
+        self._resolve_cached = functools.lru_cache(maxsize=None)(self._resolve)
+        # Populated by seal() for index-based dispatch
+        self._sealed: Optional[Tuple[Feature, ...]] = None
+        self._name_to_idx: Dict[str, int] = {}
+        self._resolved_by_idx: List[Optional[Callable[..., Any]]] = []
 
     def register(self, feature: Feature):
         """Register a feature."""
-        self._features[feature.name] = feature
-        # Clear cache when registering
-        self._availability_cache.pop(feature.name, None)
+        self.register_features((feature,))
+
+    def register_features(self, features: Iterable[Feature]):
+        """
+        Register several features at once.
+
+        Raises:
+            RuntimeError: If the manager has been sealed
+        """
+        if self._sealed is not None:
+            raise RuntimeError("Cannot register features on a sealed FeatureManager")
+        for feature in features:
+            self._features[feature.name] = feature
+            # Clear cache when registering
+            self._availability_cache.pop(feature.name, None)
+        self._invalidate_resolved()
+
+    def seal(self):
+        """
+        Freeze the registered features and enable index-based dispatch.
+
+        After sealing, hot paths can look up a feature's index once with
+        index_of() and call execute_by_index() instead of execute().
+        """
+        self._sealed = tuple(self._features.values())
+        self._name_to_idx = {f.name: i for i, f in enumerate(self._sealed)}
+        self._resolved_by_idx = [None] * len(self._sealed)
+
+    def index_of(self, name: str) -> int:
+        """
+        Get the dispatch index of a feature in a sealed manager.
+
+        Raises:
+            RuntimeError: If the manager has not been sealed
+            KeyError: If feature not registered
+        """
+        if self._sealed is None:
+            raise RuntimeError("FeatureManager must be sealed before using indices")
+        try:
+            return self._name_to_idx[name]
+        except KeyError:
+            raise KeyError(f"Feature not registered: {name}") from None
+
+    def execute_by_index(self, index: int, *args, **kwargs) -> Any:
+        """
+        Execute a feature by its index in a sealed manager.
+
+        See execute() for behaviour and exceptions.
+        """
+        impl = self._resolved_by_idx[index]
+        if impl is None:
+            impl = self._resolve(self._sealed[index].name)
+            self._resolved_by_idx[index] = impl
+        return impl(*args, **kwargs)
+
+    def _invalidate_resolved(self):
+        """Forget resolved implementations so the next call re-resolves."""
+        self._resolve_cached.cache_clear()
+        if self._resolved_by_idx:
+            self._resolved_by_idx = [None] * len(self._resolved_by_idx)
 
     def is_available(self, name: str, use_cache: bool = True) -> bool:
         """
@@ -69,19 +136,25 @@ class FeatureManager:
             name: Feature name
             use_cache: Use cached result if available
         """
-        if name not in self._features:
-            return False
-
-        if use_cache and name in self._availability_cache:
-            return self._availability_cache[name]
+        if use_cache:
+            cached = self._availability_cache.get(name, _UNSET)
+            if cached is not _UNSET:
+                return cached
 
-        feature = self._features[name]
+        feature = self._features.get(name)
+        if feature is None:
+            return False
+        if not use_cache:
+            _clear_check_cache(feature)
+            self._invalidate_resolved()
         try:
             available = feature.check()
         except Exception as e:
-            logger.debug(f"Feature check failed for {name}: {e}")
+            logger.debug("Feature check failed for %s: %s", name, e)
             available = False
 
+        # No lock: checks are idempotent, so concurrent cold-cache callers may
+        # both probe, and a single dict store publishes the result atomically.
         self._availability_cache[name] = available
         return available
 
@@ -100,18 +173,34 @@ class FeatureManager:
             KeyError: If feature not registered
             RuntimeError: If feature unavailable and no fallback
         """
-        if name not in self._features:
-            raise KeyError(f"Feature not registered: {name}")
+        return self._resolve_cached(name)(*args, **kwargs)
+
+    def resolve(self, name: str) -> Callable[..., Any]:
+        """
+        Get the implementation execute() would call for a feature.
+
+        The result is cached until the feature is re-registered or the
+        availability cache is cleared, so callers on hot paths can hold
+        on to it.
+
+        Raises:
+            KeyError: If feature not registered
+            RuntimeError: If feature unavailable and no fallback
+        """
+        return self._resolve_cached(name)
 
-        feature = self._features[name]
+    def _resolve(self, name: str) -> Callable[..., Any]:
+        feature = self._features.get(name)
+        if feature is None:
+            raise KeyError(f"Feature not registered: {name}")
 
         if self.is_available(name):
-            return feature.primary(*args, **kwargs)
+            return feature.primary
         else:
             if feature.fallback:
                 if feature.error_message:
                     logger.warning(feature.error_message)
-                return feature.fallback(*args, **kwargs)
+                return feature.fallback
             else:
                 raise RuntimeError(
                     f"Feature '{name}' is unavailable and has no fallback. "
@@ -125,10 +214,15 @@ class FeatureManager:
         Args:
             name: Specific feature to clear, or None for all
         """
+        self._invalidate_resolved()
         if name:
             self._availability_cache.pop(name, None)
+            if name in self._features:
+                _clear_check_cache(self._features[name])
         else:
             self._availability_cache.clear()
+            for feature in self._features.values():
+                _clear_check_cache(feature)
 
     def list_features(self) -> Dict[str, bool]:
         """
@@ -143,6 +237,13 @@ class FeatureManager:
         }
 
 
+def _clear_check_cache(feature: Feature):
+    """Reset a memoized check (e.g. check_vfio_available) so it re-probes."""
+    cache_clear = getattr(feature.check, "cache_clear", None)
+    if cache_clear is not None:
+        cache_clear()
+
+
 # Global feature manager
 _global_feature_manager = FeatureManager()
 
@@ -152,6 +253,11 @@ def register_feature(feature: Feature):
     _global_feature_manager.register(feature)
 
 
+def register_features(features: Iterable[Feature]):
+    """Register several features with the global manager."""
+    _global_feature_manager.register_features(features)
+
+
 def feature_available(name: str) -> bool:
     """Check if a feature is available."""
     return _global_feature_manager.is_available(name)
@@ -163,6 +269,10 @@ def execute_feature(name: str, *args, **kwargs) -> Any:
 
 
 # Common feature checks
+#
+# These probe the host and their result does not change during normal
+# operation, so they are memoized. FeatureManager.clear_cache() resets them.
+@functools.cache
 def check_libvirt_available() -> bool:
     """Check if libvirt is available."""
     try:
@@ -176,6 +286,7 @@ def check_libvirt_available() -> bool:
     return False
 
 
+@functools.cache
 def check_gtk_available() -> bool:
     """Check if GTK is available."""
     try:
@@ -184,6 +295,7 @@ def check_gtk_available() -> bool:
         return False
 
 
+@functools.cache
 def check_vfio_available() -> bool:
     """Check if VFIO is available."""
     try:
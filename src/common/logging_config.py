@@ -6,20 +6,136 @@ Provides structured logging with JSON and colored console output.
 
 from __future__ import annotations
 
+import atexit
+import contextvars
+import functools
 import logging
 import logging.handlers
+import os
+import queue
 import sys
 import json
+import time
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
 from typing import Optional
 
+from .resources import register_cleanup
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode()
+
+    def _json_dumps_line(obj) -> bytes:
+        return orjson.dumps(
+            obj, default=str, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+        )
+else:
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, default=str)
+
+    def _json_dumps_line(obj) -> bytes:
+        return (json.dumps(obj, default=str) + "\n").encode("utf-8")
+
+# Background listener that owns the console/file handlers (see setup_logging)
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_cleanup_registered = False
+
+# Third-party loggers capped at WARNING by setup_logging()
+_NOISY_LOGGERS = ("libvirt", "libvirtaio", "urllib3", "gi", "asyncio")
+
+# Whether the console handler may use colors; checked once at import
+_STDERR_IS_TTY = sys.stderr is not None and sys.stderr.isatty()
+
+# Source-file marker logging uses to find the caller; cleared when unused
+_SRCFILE = logging._srcfile
+
+# Fields added by the active LogContext(s) of the current thread/task
+_log_context: contextvars.ContextVar[dict] = contextvars.ContextVar(
+    "neuronos_log_context", default={}
+)
+_context_factory_installed = False
+
+
+# Fixed leading fields of a JSON record; the closing brace is added by the
+# caller after any optional fields
+_JSON_RECORD_TEMPLATE = (
+    '{"timestamp": %s, "level": %s, "logger": %s, "message": %s, '
+    '"module": %s, "function": %s, "line": %d'
+)
+
+
+def _json_str(value: Optional[str]) -> str:
+    """Encode a string (or None) as a JSON literal, as json.dumps would."""
+    return "null" if value is None else encode_basestring_ascii(value)
+
 
 class JSONFormatter(logging.Formatter):
     """JSON log formatter for machine-readable logs."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (whole second, formatted date/time) reused for records in that second
+        self._second_cache = (None, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, prefix = self._second_cache
+        if second != cached_second:
+            prefix = time.strftime(self.default_time_format, self.converter(record.created))
+            self._second_cache = (second, prefix)
+        return self.default_msec_format % (prefix, record.msecs)
+
     def format(self, record: logging.LogRecord) -> str:
+        if ORJSON_AVAILABLE:
+            return _json_dumps(self._record_data(record))
+        return self._format_template(record)
+
+    def format_bytes(self, record: logging.LogRecord) -> bytes:
+        """Format a record as one UTF-8 encoded, newline-terminated JSON line."""
+        if ORJSON_AVAILABLE:
+            return _json_dumps_line(self._record_data(record))
+        return (self._format_template(record) + "\n").encode("utf-8")
+
+    def _format_template(self, record: logging.LogRecord) -> str:
+        """
+        Render the fixed fields through a prebuilt template.
+
+        Produces the same text as json.dumps(self._record_data(record)) without
+        building the dict or running the generic encoder; only used when
+        orjson, which is faster still, is unavailable.
+        """
+        result = _JSON_RECORD_TEMPLATE % (
+            _json_str(self.formatTime(record, self.datefmt)),
+            _json_str(record.levelname),
+            _json_str(record.name),
+            _json_str(record.getMessage()),
+            _json_str(record.module),
+            _json_str(record.funcName),
+            record.lineno,
+        )
+        if record.exc_info:
+            result += ', "exception": ' + _json_str(self.formatException(record.exc_info))
+        extra_data = getattr(record, "extra_data", None)
+        if extra_data is not None:
+            result += ', "data": ' + _json_dumps(extra_data)
+        return result + "}"
+
+    def _record_data(self, record: logging.LogRecord) -> dict:
         log_data = {
-            "timestamp": self.formatTime(record),
+            "timestamp": self.formatTime(record, self.datefmt),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -31,10 +147,11 @@ class JSONFormatter(logging.Formatter):
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
 
-        if hasattr(record, "extra_data"):
-            log_data["data"] = record.extra_data
+        extra_data = getattr(record, "extra_data", None)
+        if extra_data is not None:
+            log_data["data"] = extra_data
 
-        return json.dumps(log_data)
+        return log_data
 
 
 class ColoredFormatter(logging.Formatter):
@@ -49,23 +166,240 @@ class ColoredFormatter(logging.Formatter):
     }
     RESET = "\033[0m"
     BOLD = "\033[1m"
+    CONSOLE_FORMAT = "%(levelname)s %(name)s: %(message)s"
+
+    def __init__(self, fmt: Optional[str] = None, *args, **kwargs):
+        super().__init__(fmt, *args, **kwargs)
+        self._colored_levels = {
+            level: f"{color}{logging.getLevelName(level)}{self.RESET}"
+            for level, color in self.COLORS.items()
+        }
+        # The console layout is rendered directly instead of via %-style
+        self._console_layout = fmt == self.CONSOLE_FORMAT
+
+    def _colored_levelname(self, record: logging.LogRecord) -> str:
+        colored = self._colored_levels.get(record.levelno)
+        if colored is None:
+            return f"{record.levelname}{self.RESET}"
+        return colored
 
     def format(self, record: logging.LogRecord) -> str:
-        color = self.COLORS.get(record.levelno, "")
-        levelname = record.levelname
-        
-        # Apply color to level name
-        record.levelname = f"{color}{levelname}{self.RESET}"
-        
-        # Format the message
-        result = super().format(record)
-        
-        # Restore original levelname for other handlers
-        record.levelname = levelname
-        
+        if not self._console_layout:
+            levelname = record.levelname
+            record.levelname = self._colored_levelname(record)
+            try:
+                return super().format(record)
+            finally:
+                # Restore original levelname for other handlers
+                record.levelname = levelname
+
+        result = f"{self._colored_levelname(record)} {record.name}: {record.getMessage()}"
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            result = f"{result}\n{record.exc_text}"
+        if record.stack_info:
+            result = f"{result}\n{self.formatStack(record.stack_info)}"
         return result
 
 
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler feeding a listener in the same process.
+
+    The stock prepare() formats the record on the caller's thread and drops
+    exc_info. Only the message arguments are merged here, so formatting
+    happens on the listener thread and tracebacks reach the file handler.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _BatchRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that leaves flushing its stream to flush().
+
+    StreamHandler.emit() flushes after every record; here records collect
+    in the stream buffer and _BatchingMemoryHandler flushes once per batch.
+    The file size is counted here rather than by shouldRollover(), whose
+    seek() would flush the stream on every record.
+    """
+
+    def _open(self):
+        stream = super()._open()
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            data = (self.format(record) + self.terminator).encode(
+                self.stream.encoding, self.stream.errors
+            )
+            if (
+                self.maxBytes > 0
+                and self.backupCount > 0
+                and self._size
+                and self._size + len(data) >= self.maxBytes
+            ):
+                self.doRollover()
+            # Bytes go straight to the binary buffer, already encoded
+            self.stream.buffer.write(data)
+            self._size += len(data)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class _JSONFileHandler(logging.Handler):
+    """
+    Size-rotated JSON-lines file handler writing through a raw descriptor.
+
+    Records are encoded to bytes as they arrive and the pending batch is
+    written with a single os.write() on flush(), bypassing the text I/O
+    layer. Rotation follows RotatingFileHandler's naming (log, log.1, ...).
+    """
+
+    def __init__(self, filename: Path, maxBytes: int = 0, backupCount: int = 0):
+        super().__init__()
+        self.baseFilename = os.path.abspath(os.fspath(filename))
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        self._buffer = bytearray()
+        self._fd: Optional[int] = self._open()
+        self._size = os.fstat(self._fd).st_size
+
+    def _open(self) -> int:
+        return os.open(self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            formatter = self.formatter
+            if isinstance(formatter, JSONFormatter):
+                data = formatter.format_bytes(record)
+            else:
+                data = (self.format(record) + "\n").encode("utf-8")
+            pending = self._size + len(self._buffer)
+            if (
+                self.maxBytes > 0
+                and self.backupCount > 0
+                and pending
+                and pending + len(data) >= self.maxBytes
+            ):
+                self._write_buffer()
+                self._rollover()
+            self._buffer += data
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            self._write_buffer()
+
+    def close(self):
+        with self.lock:
+            try:
+                self._write_buffer()
+            finally:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                super().close()
+
+    def _write_buffer(self):
+        if not self._buffer or self._fd is None:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+        self._size += len(data)
+
+    def _rollover(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        try:
+            for i in range(self.backupCount - 1, 0, -1):
+                source = f"{self.baseFilename}.{i}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.baseFilename}.{i + 1}")
+            # The log may have been removed or rotated by someone else
+            if os.path.exists(self.baseFilename):
+                os.replace(self.baseFilename, f"{self.baseFilename}.1")
+        finally:
+            # Reopen even if a rename failed, so logging carries on
+            self._fd = self._open()
+            self._size = os.fstat(self._fd).st_size
+
+
+class _BatchingMemoryHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that flushes its target once after writing a batch."""
+
+    def flush(self):
+        with self.lock:
+            super().flush()
+            if self.target is not None:
+                self.target.flush()
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes buffered handlers whenever the queue runs dry."""
+
+    def dequeue(self, block: bool):
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
+
+
+def _stop_listener():
+    """
+    Drain queued records and close the file handlers of the current listener.
+
+    The root logger's queue handler is replaced by the console handler, so
+    records logged afterwards (e.g. by later cleanup code) are written
+    directly instead of being queued with nobody to read them.
+    """
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    # Undo setup_logging()'s process-wide change to caller lookup
+    logging._srcfile = _SRCFILE
+
+    root_logger = logging.getLogger()
+    queue_handlers = [
+        handler for handler in root_logger.handlers
+        if isinstance(handler, _LocalQueueHandler) and handler.queue is listener.queue
+    ]
+    for handler in queue_handlers:
+        root_logger.removeHandler(handler)
+
+    for handler in listener.handlers:
+        target = getattr(handler, "target", None)
+        if target is None:
+            # Console: keep it, attached directly, if we detached the queue
+            if queue_handlers:
+                root_logger.addHandler(handler)
+            continue
+        handler.close()
+        target.close()
+
+
+# Runs before logging.shutdown() (registered earlier, so run later)
+atexit.register(_stop_listener)
+
+
 def setup_logging(
     level: int = logging.INFO,
     log_file: Optional[Path] = None,
@@ -80,63 +414,124 @@ def setup_logging(
         log_file: Path to log file (optional)
         json_logs: Use JSON format for file logs
         log_dir: Directory for log files (creates neuronos.log)
+
+    Records are handed to a background thread through a queue; console and
+    file output happen there so callers never block on I/O.
+
+    Without a log file, caller lookup is switched off process-wide: records
+    have no funcName/lineno and stack_info=True is ignored, for every
+    logger and handler, until logging is torn down.
     """
+    global _listener, _listener_cleanup_registered
+
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
+    _install_context_factory()
 
-    # Clear existing handlers
+    # Clear existing handlers, once the old listener has written its queue
+    _stop_listener()
     root_logger.handlers.clear()
+    handlers = []
+
+    # Determine log file path
+    if log_dir:
+        log_file = log_dir / "neuronos.log"
+
+    # None of our formats use thread/process info. Caller lookup
+    # (sys._getframe walk) is only needed for file logs.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging._srcfile = _SRCFILE if log_file else None
 
     # Console handler with colors (if terminal supports it)
     console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setLevel(level)
 
-    if sys.stderr.isatty():
-        console_format = ColoredFormatter(
-            "%(levelname)s %(name)s: %(message)s"
-        )
+    if _STDERR_IS_TTY:
+        console_format = ColoredFormatter(ColoredFormatter.CONSOLE_FORMAT)
     else:
         console_format = logging.Formatter(
             "%(levelname)s %(name)s: %(message)s"
         )
 
     console_handler.setFormatter(console_format)
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
-    # Determine log file path
-    if log_dir:
-        log_file = log_dir / "neuronos.log"
-    
     # File handler with rotation
     if log_file:
         log_file.parent.mkdir(parents=True, exist_ok=True)
 
-        file_handler = logging.handlers.RotatingFileHandler(
-            log_file,
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5,
-            encoding="utf-8",
-        )
-        file_handler.setLevel(logging.DEBUG)  # Capture all to file
-
         if json_logs:
+            file_handler = _JSONFileHandler(
+                log_file,
+                maxBytes=10 * 1024 * 1024,  # 10MB
+                backupCount=5,
+            )
             file_handler.setFormatter(JSONFormatter())
         else:
+            file_handler = _BatchRotatingFileHandler(
+                log_file,
+                maxBytes=10 * 1024 * 1024,  # 10MB
+                backupCount=5,
+                encoding="utf-8",
+            )
             file_handler.setFormatter(logging.Formatter(
                 "%(asctime)s %(levelname)s %(name)s [%(filename)s:%(lineno)d] %(message)s"
             ))
+        file_handler.setLevel(logging.DEBUG)  # Capture all to file
 
-        root_logger.addHandler(file_handler)
+        # Written in batches: when 512 records are buffered, on ERROR, or
+        # as soon as the listener has no more queued records
+        handlers.append(_BatchingMemoryHandler(
+            capacity=512,
+            flushLevel=logging.ERROR,
+            target=file_handler,
+            flushOnClose=True,
+        ))
+
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(_LocalQueueHandler(log_queue))
+    _listener = _BatchingQueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    # _stop_listener always stops whichever listener is current
+    if not _listener_cleanup_registered:
+        register_cleanup(_stop_listener)
+        _listener_cleanup_registered = True
 
     # Suppress noisy loggers
-    logging.getLogger("libvirt").setLevel(logging.WARNING)
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
-    logging.getLogger("gi").setLevel(logging.WARNING)
+    for name in _NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def _install_context_factory():
+    """Install the record factory that attaches LogContext fields (once)."""
+    global _context_factory_installed
+    if _context_factory_installed:
+        return
+    _context_factory_installed = True
+
+    base_factory = logging.getLogRecordFactory()
+    get_context = _log_context.get
+
+    def record_factory(*args, **kwargs):
+        record = base_factory(*args, **kwargs)
+        context = get_context()
+        if context:
+            record.extra_data = context
+        return record
+
+    logging.setLogRecordFactory(record_factory)
 
 
 class LogContext:
     """
     Context manager for adding context to log messages.
+
+    Nested contexts merge their fields, and the context follows the current
+    thread or asyncio task.
     
     Example:
         with LogContext(vm_name="my-vm", operation="start"):
@@ -145,28 +540,28 @@ class LogContext:
 
     def __init__(self, **kwargs):
         self.context = kwargs
-        self._old_factory = None
+        self._token: Optional[contextvars.Token] = None
 
     def __enter__(self):
-        self._old_factory = logging.getLogRecordFactory()
-
-        context = self.context
-
-        def record_factory(*args, **kwargs):
-            record = self._old_factory(*args, **kwargs)
-            record.extra_data = context
-            return record
-
-        logging.setLogRecordFactory(record_factory)
+        _install_context_factory()
+        self._token = _log_context.set({**_log_context.get(), **self.context})
         return self
 
     def __exit__(self, *args):
-        logging.setLogRecordFactory(self._old_factory)
+        _log_context.reset(self._token)
+        self._token = None
 
 
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger with the NeuronOS prefix.
+
+    Level checks are cheap: logging.Logger caches isEnabledFor() results
+    per level and drops the cache whenever levels are reconfigured. Guard
+    expensive argument construction on hot paths with it:
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("state: %s", expensive_dump())
     
     Args:
         name: Logger name (typically __name__)
@@ -174,4 +569,10 @@ def get_logger(name: str) -> logging.Logger:
     Returns:
         Configured logger instance
     """
-    return logging.getLogger(f"neuronos.{name}")
+    return _prefixed_logger(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _prefixed_logger(name: str) -> logging.Logger:
+    # Loggers are never destroyed, so caching them per name is safe
+    return logging.getLogger("neuronos." + name)
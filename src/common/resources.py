@@ -6,15 +6,22 @@ Provides thread-safe resource acquisition, pooling, and cleanup.
 
 from __future__ import annotations
 
+import itertools
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
-from typing import TypeVar, Generic, Callable, Optional, List
+from typing import TypeVar, Generic, Callable, Optional, Deque, Dict, List
 import logging
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Below this many callbacks a thread pool costs more than it saves
+_PARALLEL_CLEANUP_MIN = 4
+_PARALLEL_CLEANUP_MAX_WORKERS = 16
+
 
 class ManagedResource(Generic[T]):
     """
@@ -45,6 +52,13 @@ class ManagedResource(Generic[T]):
 
     def get(self) -> T:
         """Get the resource, acquiring if needed."""
+        # Fast path without the lock: reading the reference is atomic, and a
+        # resource released concurrently is no different from one released
+        # right after get() returns. Acquire/replace/release stay locked.
+        resource = self._resource
+        if resource is not None and (self._validate is None or self._validate(resource)):
+            return resource
+
         with self._lock:
             # Check if we need to (re)acquire
             if self._resource is None or (
@@ -55,7 +69,7 @@ class ManagedResource(Generic[T]):
                     try:
                         self._release(self._resource)
                     except Exception as e:
-                        logger.debug(f"Error releasing stale resource: {e}")
+                        logger.debug("Error releasing stale resource: %s", e)
                 
                 # Acquire new resource
                 self._resource = self._acquire()
@@ -114,7 +128,8 @@ class ResourcePool(Generic[T]):
         self._destroy = destroy
         self._validate = validate
         self._max_size = max_size
-        self._pool: List[T] = []
+        # FIFO: the longest-idle resource is reused (and validated) first
+        self._pool: Deque[T] = deque()
         self._lock = threading.Lock()
         self._created_count = 0
 
@@ -127,47 +142,57 @@ class ResourcePool(Generic[T]):
         finally:
             self._return(resource)
 
+    # The lock only guards the deque and the counter. create, validate and
+    # destroy (which may do I/O) and any logging run outside it.
+
     def _get(self) -> T:
+        # Try to get from pool
+        while True:
+            with self._lock:
+                if not self._pool:
+                    break
+                resource = self._pool.popleft()
+            if self._validate(resource):
+                return resource
+            # Invalid resource, destroy it
+            self._discard(resource, "invalid resource")
+
+        # Create new resource
+        resource = self._create()
         with self._lock:
-            # Try to get from pool
-            while self._pool:
-                resource = self._pool.pop()
-                if self._validate(resource):
-                    return resource
-                # Invalid resource, destroy it
-                try:
-                    self._destroy(resource)
-                    self._created_count -= 1
-                except Exception as e:
-                    logger.debug(f"Error destroying invalid resource: {e}")
-
-            # Create new resource
-            resource = self._create()
             self._created_count += 1
-            return resource
+        return resource
 
     def _return(self, resource: T):
+        if self._validate(resource):
+            with self._lock:
+                if len(self._pool) < self._max_size:
+                    self._pool.append(resource)
+                    return
+        self._discard(resource, "resource")
+
+    def _discard(self, resource: T, description: str):
+        try:
+            self._destroy(resource)
+        except Exception as e:
+            logger.debug("Error destroying %s: %s", description, e)
+            return
         with self._lock:
-            if len(self._pool) < self._max_size and self._validate(resource):
-                self._pool.append(resource)
-            else:
-                try:
-                    self._destroy(resource)
-                    self._created_count -= 1
-                except Exception as e:
-                    logger.debug(f"Error destroying resource: {e}")
+            self._created_count -= 1
 
     def clear(self):
         """Clear all pooled resources."""
         with self._lock:
-            for resource in self._pool:
-                try:
-                    self._destroy(resource)
-                except Exception as e:
-                    logger.debug(f"Error destroying pooled resource: {e}")
+            resources = tuple(self._pool)
             self._pool.clear()
             self._created_count = 0
 
+        for resource in resources:
+            try:
+                self._destroy(resource)
+            except Exception as e:
+                logger.debug("Error destroying pooled resource: %s", e)
+
     @property
     def size(self) -> int:
         """Current pool size."""
@@ -195,31 +220,74 @@ class CleanupRegistry:
     """
 
     def __init__(self):
-        self._callbacks: List[Callable[[], None]] = []
+        # Callbacks in registration order, keyed by a sequence number so a
+        # callback registered twice runs twice and unhashable callbacks
+        # (e.g. methods of a dataclass instance) are accepted
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        # Sequence numbers of each hashable callback, oldest first, so that
+        # unregister() finds an equal callback (e.g. a fresh obj.close bound
+        # method) without scanning
+        self._seqs: Dict[Callable[[], None], List[int]] = {}
+        self._next_seq = itertools.count()
         self._lock = threading.Lock()
 
     def register(self, callback: Callable[[], None]):
         """Register a cleanup callback."""
         with self._lock:
-            self._callbacks.append(callback)
+            seq = next(self._next_seq)
+            self._callbacks[seq] = callback
+            try:
+                self._seqs.setdefault(callback, []).append(seq)
+            except TypeError:
+                pass  # Unhashable; unregister() falls back to a scan
 
     def unregister(self, callback: Callable[[], None]):
-        """Unregister a cleanup callback."""
+        """Unregister a cleanup callback (its earliest registration)."""
         with self._lock:
-            if callback in self._callbacks:
-                self._callbacks.remove(callback)
-
-    def cleanup_all(self):
-        """Execute all cleanup callbacks (in reverse order)."""
+            try:
+                seqs = self._seqs.get(callback)
+            except TypeError:
+                for seq, registered in self._callbacks.items():
+                    if registered == callback:
+                        del self._callbacks[seq]
+                        break
+                return
+            if seqs:
+                del self._callbacks[seqs.pop(0)]
+                if not seqs:
+                    del self._seqs[callback]
+
+    def cleanup_all(self, parallel: bool = False):
+        """
+        Execute all cleanup callbacks (in reverse order).
+
+        Args:
+            parallel: Run callbacks concurrently on a thread pool. Only use
+                this when the callbacks are independent (e.g. closing many
+                unrelated connections); ordering is not preserved.
+        """
         with self._lock:
-            callbacks = self._callbacks.copy()
+            callbacks = tuple(self._callbacks.values())
             self._callbacks.clear()
+            self._seqs.clear()
+
+        if parallel and len(callbacks) > _PARALLEL_CLEANUP_MIN:
+            with ThreadPoolExecutor(
+                max_workers=min(_PARALLEL_CLEANUP_MAX_WORKERS, len(callbacks)),
+                thread_name_prefix="neuronos-cleanup",
+            ) as executor:
+                futures = [executor.submit(callback) for callback in reversed(callbacks)]
+                for future in as_completed(futures):
+                    e = future.exception()
+                    if e is not None:
+                        logger.warning("Cleanup callback failed: %s", e)
+            return
 
         for callback in reversed(callbacks):
             try:
                 callback()
             except Exception as e:
-                logger.warning(f"Cleanup callback failed: {e}")
+                logger.warning("Cleanup callback failed: %s", e)
 
 
 # Global cleanup registry
@@ -231,6 +299,6 @@ def register_cleanup(callback: Callable[[], None]):
     _global_cleanup.register(callback)
 
 
-def cleanup_all():
+def cleanup_all(parallel: bool = False):
     """Execute all global cleanup callbacks."""
-    _global_cleanup.cleanup_all()
+    _global_cleanup.cleanup_all(parallel=parallel)
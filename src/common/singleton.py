@@ -96,14 +96,19 @@ class ReadWriteLock:
     def __init__(self):
         self._read_ready = threading.Condition(threading.Lock())
         self._readers = 0
+        self._writers_waiting = 0
+        # The contexts hold no per-acquire state, so one of each is shared
+        # by every (including concurrent and nested) with-block.
+        self._read_context = _ReadLockContext(self)
+        self._write_context = _WriteLockContext(self)
 
     def read(self):
         """Context manager for acquiring read lock."""
-        return _ReadLockContext(self)
+        return self._read_context
 
     def write(self):
         """Context manager for acquiring write lock."""
-        return _WriteLockContext(self)
+        return self._write_context
 
     def acquire_read(self):
         """Acquire read lock."""
@@ -114,14 +119,19 @@ class ReadWriteLock:
         """Release read lock."""
         with self._read_ready:
             self._readers -= 1
-            if self._readers == 0:
+            if self._readers == 0 and self._writers_waiting:
                 self._read_ready.notify_all()
 
     def acquire_write(self):
         """Acquire write lock (waits for all readers)."""
         self._read_ready.acquire()
-        while self._readers > 0:
-            self._read_ready.wait()
+        if self._readers > 0:
+            self._writers_waiting += 1
+            try:
+                while self._readers > 0:
+                    self._read_ready.wait()
+            finally:
+                self._writers_waiting -= 1
 
     def release_write(self):
         """Release write lock."""
@@ -129,6 +139,8 @@ class ReadWriteLock:
 
 
 class _ReadLockContext:
+    __slots__ = ("_lock",)
+
     def __init__(self, lock: ReadWriteLock):
         self._lock = lock
 
@@ -141,6 +153,8 @@ class _ReadLockContext:
 
 
 class _WriteLockContext:
+    __slots__ = ("_lock",)
+
     def __init__(self, lock: ReadWriteLock):
         self._lock = lock
 
@@ -155,6 +169,9 @@ class _WriteLockContext:
 class AtomicCounter:
     """
     Thread-safe atomic counter.
+
+    Updates are serialized by a lock; reading the value is a single
+    attribute load and needs none.
     
     Example:
         counter = AtomicCounter()
@@ -168,8 +185,7 @@ class AtomicCounter:
 
     @property
     def value(self) -> int:
-        with self._lock:
-            return self._value
+        return self._value
 
     def increment(self, amount: int = 1) -> int:
         """Increment and return new value."""
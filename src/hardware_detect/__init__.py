@@ -7,10 +7,35 @@ This module provides automatic detection of:
 - VFIO configuration generation
 """
 
-from .gpu_scanner import GPUScanner, GPUDevice
-from .iommu_parser import IOMMUParser, IOMMUGroup, IOMMUDevice
-from .cpu_detect import CPUDetector, CPUInfo
-from .config_generator import ConfigGenerator, VFIOConfig
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562), so a CLI
+# command only loads the detectors it actually uses.
+_LAZY_ATTRS = {
+    "GPUScanner": "gpu_scanner",
+    "GPUDevice": "gpu_scanner",
+    "IOMMUParser": "iommu_parser",
+    "IOMMUGroup": "iommu_parser",
+    "IOMMUDevice": "iommu_parser",
+    "CPUDetector": "cpu_detect",
+    "CPUInfo": "cpu_detect",
+    "ConfigGenerator": "config_generator",
+    "VFIOConfig": "config_generator",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = [
     # GPU Scanner
@@ -8,14 +8,15 @@ Unified CLI for all hardware detection functionality.
 import argparse
 import sys
 
-from .gpu_scanner import GPUScanner
-from .iommu_parser import IOMMUParser
-from .cpu_detect import CPUDetector
-from .config_generator import ConfigGenerator
+# Detector modules are imported inside each command so that a command
+# only pays for what it uses.
 
 
 def cmd_scan(args):
     """Scan and display hardware."""
+    from .cpu_detect import CPUDetector
+    from .gpu_scanner import GPUScanner
+
     print("=== NeuronOS Hardware Detection ===\n")
 
     # CPU
@@ -50,6 +51,8 @@ def cmd_scan(args):
 
 def cmd_iommu(args):
     """Display IOMMU groups."""
+    from .iommu_parser import IOMMUParser
+
     parser = IOMMUParser()
     try:
         parser.parse_all()
@@ -61,6 +64,8 @@ def cmd_iommu(args):
 
 def cmd_config(args):
     """Generate VFIO configuration."""
+    from .config_generator import ConfigGenerator
+
     generator = ConfigGenerator()
 
     if args.apply:
@@ -74,6 +79,10 @@ def cmd_config(args):
 
 def cmd_check(args):
     """Quick compatibility check."""
+    from .cpu_detect import CPUDetector
+    from .gpu_scanner import GPUScanner
+    from .iommu_parser import IOMMUParser
+
     print("=== NeuronOS Compatibility Check ===\n")
 
     issues = []
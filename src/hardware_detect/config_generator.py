@@ -9,16 +9,54 @@ Generates all necessary configuration files for GPU passthrough:
 - Bootloader configuration updates
 """
 
+import os
 import re
 import subprocess
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 
 from .gpu_scanner import GPUScanner, GPUDevice
 from .iommu_parser import IOMMUParser, IOMMUGroup
 from .cpu_detect import CPUDetector
 
+T = TypeVar("T")
+
+_MODULES_RE = re.compile(r'MODULES=\([^)]*\)')
+_GRUB_CMDLINE_RE = re.compile(r'(GRUB_CMDLINE_LINUX_DEFAULT="[^"]*)')
+_OPTIONS_LINE_RE = re.compile(r'^([ \t]*options .*)$', re.M)
+
+# /etc/modprobe.d/vfio.conf, filled with:
+# vendor name, device name, PCI address, comma-separated vfio-pci IDs
+_VFIO_CONF_TEMPLATE = """# NeuronOS VFIO Configuration
+# Auto-generated for GPU passthrough
+# Target GPU: %s %s
+# PCI Address: %s
+#
+# This file binds the discrete GPU to the vfio-pci driver at boot,
+# making it available for VM passthrough instead of the host.
+
+# Bind these devices to vfio-pci driver
+options vfio-pci ids=%s
+
+# Ensure vfio-pci loads before any GPU drivers
+# This prevents the GPU driver from claiming the device first
+softdep nvidia pre: vfio-pci
+softdep nvidia_drm pre: vfio-pci
+softdep nvidia_modeset pre: vfio-pci
+softdep nouveau pre: vfio-pci
+softdep amdgpu pre: vfio-pci
+softdep radeon pre: vfio-pci
+softdep i915 pre: vfio-pci
+
+# Blacklist the GPU driver for the passthrough device (optional)
+# Uncomment if needed:
+# blacklist nouveau
+# blacklist nvidia
+"""
+
 
 @dataclass
 class VFIOConfig:
@@ -51,38 +89,157 @@ class ConfigGenerator:
         self.scanner = GPUScanner()
         self.iommu_parser = IOMMUParser()
         self.cpu_detector = CPUDetector()
+        # Hardware probe results, kept until refresh() is called
+        self._cache: Dict[object, object] = {}
+        # Exceptions from _probe_hardware(), raised by the next _cached()
+        self._probe_errors: Dict[object, BaseException] = {}
+        # Last generated config and the system state it was generated for
+        self._last_config: Optional[Tuple[Tuple[int, int], VFIOConfig]] = None
+
+    def refresh(self) -> None:
+        """Discard cached probe results so the next detection re-runs them."""
+        self._cache.clear()
+        self._probe_errors.clear()
+        self._last_config = None
+        self.cpu_detector.invalidate()
+
+    def _config_cache_key(self) -> Tuple[int, int]:
+        """
+        Cheap fingerprint of the state a generated config depends on.
+
+        Uses the /proc/cmdline mtime and the number of IOMMU groups,
+        which change when the kernel is booted with different
+        parameters or the IOMMU comes up. Both cost one syscall or a
+        short directory listing.
+        """
+        try:
+            cmdline_mtime = os.stat(self.cpu_detector.CMDLINE_PATH).st_mtime_ns
+        except OSError:
+            cmdline_mtime = -1
+
+        try:
+            with os.scandir(self.iommu_parser.IOMMU_PATH) as it:
+                group_count = sum(1 for _ in it)
+        except OSError:
+            group_count = -1
+
+        return cmdline_mtime, group_count
+
+    def _cached(self, key: object, probe: Callable[[], T]) -> T:
+        """Return the cached result for key, running probe on first use."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        error = self._probe_errors.pop(key, None)
+        if error is not None:
+            raise error
+        value = self._cache[key] = probe()
+        return value
+
+    def _probe_hardware(self) -> None:
+        """
+        Run the uncached CPU, GPU and IOMMU probes concurrently.
+
+        They spend their time in file reads and subprocesses, so
+        overlapping them costs less than running them in turn. The IOMMU
+        walk is only used for a passthrough GPU, so it is started once the
+        GPU scan has found one, overlapping whatever is left of the CPU
+        probe. A probe that raises is left uncached and its exception is
+        kept; the caller's own _cached() call raises it where it expects
+        it, without running the probe again.
+        """
+        probes = {
+            "cpu": self.cpu_detector.detect,
+            "gpus": self.scanner.scan,
+        }
+        pending = {key: probe for key, probe in probes.items() if key not in self._cache}
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+            futures = {key: executor.submit(probe) for key, probe in pending.items()}
+            if "gpus" in futures:
+                self._collect_probe("gpus", futures.pop("gpus"))
+            if (
+                "iommu_groups" not in self._cache
+                and self._cache.get("gpus")
+                and self.scanner.get_passthrough_candidate() is not None
+            ):
+                futures["iommu_groups"] = executor.submit(self.iommu_parser.parse_all)
+
+        for key, future in futures.items():
+            self._collect_probe(key, future)
+
+    def _collect_probe(self, key: object, future: Future) -> None:
+        """Cache a finished probe's result, or keep its exception."""
+        error = future.exception()
+        if error is None:
+            self._cache[key] = future.result()
+        else:
+            self._probe_errors[key] = error
 
     def detect_bootloader(self, target_root: Path = Path("/")) -> str:
         """Detect which bootloader is installed."""
+        return self._cached(
+            ("bootloader", target_root),
+            lambda: self._detect_bootloader(target_root),
+        )
+
+    def _detect_bootloader(self, target_root: Path) -> str:
+        root = os.fspath(target_root)
+
         # Check for systemd-boot first (more modern)
-        systemd_boot = target_root / "boot/loader/loader.conf"
-        if systemd_boot.exists():
+        if os.path.isfile(os.path.join(root, "boot/loader/loader.conf")):
             return "systemd-boot"
 
         # Check for GRUB
-        grub_cfg = target_root / "boot/grub/grub.cfg"
-        if grub_cfg.exists():
+        if os.path.isfile(os.path.join(root, "boot/grub/grub.cfg")):
             return "grub"
 
         # Check EFI directory for clues
-        efi_boot = target_root / "boot/EFI"
-        if efi_boot.exists():
-            if (efi_boot / "systemd").exists():
-                return "systemd-boot"
-            if (efi_boot / "grub").exists():
-                return "grub"
+        try:
+            with os.scandir(os.path.join(root, "boot/EFI")) as it:
+                efi_entries = {entry.name for entry in it}
+        except OSError:
+            return "unknown"
+
+        if "systemd" in efi_entries:
+            return "systemd-boot"
+        if "grub" in efi_entries:
+            return "grub"
 
         return "unknown"
 
     def detect_and_generate(self) -> VFIOConfig:
-        """Run full hardware detection and generate configuration."""
+        """
+        Run full hardware detection and generate configuration.
+
+        The result is reused by later calls (e.g. print_config() followed
+        by apply_to_target()) until refresh() is called or the cache key
+        changes, in which case everything is probed again.
+        """
+        key = self._config_cache_key()
+        if self._last_config is not None:
+            if self._last_config[0] == key:
+                return self._last_config[1]
+            self.refresh()
+
+        config = self._generate()
+        self._last_config = (key, config)
+        return config
+
+    def _generate(self) -> VFIOConfig:
         warnings = []
         errors = []
         passthrough_gpu = None
         boot_gpu = None
 
+        self._probe_hardware()
+
         # Step 1: Detect CPU and get IOMMU parameter
-        cpu = self.cpu_detector.detect()
+        cpu = self._cached("cpu", self.cpu_detector.detect)
+        bootloader = self.detect_bootloader()
 
         if not cpu.has_virtualization:
             errors.append(
@@ -96,20 +253,11 @@ class ConfigGenerator:
             )
 
         # Step 2: Scan GPUs
-        gpus = self.scanner.scan()
+        gpus = self._cached("gpus", self.scanner.scan)
 
         if not gpus:
             errors.append("No GPUs detected! Cannot configure passthrough.")
-            return VFIOConfig(
-                vfio_conf="",
-                mkinitcpio_modules="",
-                kernel_params=cpu.iommu_param,
-                bootloader=self.detect_bootloader(),
-                passthrough_gpu=None,
-                boot_gpu=None,
-                warnings=warnings,
-                errors=errors,
-            )
+            return self._empty_config(cpu.iommu_param, bootloader, None, warnings, errors)
 
         if len(gpus) < 2:
             warnings.append(
@@ -126,21 +274,12 @@ class ConfigGenerator:
                 "No suitable GPU found for passthrough. All GPUs are marked as boot VGA. "
                 "For single-GPU passthrough, you need to manually configure switching."
             )
-            return VFIOConfig(
-                vfio_conf="",
-                mkinitcpio_modules="",
-                kernel_params=cpu.iommu_param,
-                bootloader=self.detect_bootloader(),
-                passthrough_gpu=None,
-                boot_gpu=boot_gpu,
-                warnings=warnings,
-                errors=errors,
-            )
+            return self._empty_config(cpu.iommu_param, bootloader, boot_gpu, warnings, errors)
 
         # Step 4: Parse IOMMU groups
         gpu_group = None
         try:
-            self.iommu_parser.parse_all()
+            self._cached("iommu_groups", self.iommu_parser.parse_all)
             gpu_group = self.iommu_parser.get_gpu_group(passthrough_gpu.pci_address)
 
             if gpu_group and not gpu_group.is_clean:
@@ -159,7 +298,6 @@ class ConfigGenerator:
         vfio_conf = self._generate_vfio_conf(pci_ids, passthrough_gpu)
         mkinitcpio_modules = self._generate_mkinitcpio()
         kernel_params = cpu.iommu_param
-        bootloader = self.detect_bootloader()
 
         return VFIOConfig(
             vfio_conf=vfio_conf,
@@ -172,51 +310,47 @@ class ConfigGenerator:
             errors=errors,
         )
 
+    @staticmethod
+    def _empty_config(
+        kernel_params: str,
+        bootloader: str,
+        boot_gpu: Optional[GPUDevice],
+        warnings: List[str],
+        errors: List[str],
+    ) -> VFIOConfig:
+        """Build the config returned when no passthrough GPU can be set up."""
+        return VFIOConfig(
+            vfio_conf="",
+            mkinitcpio_modules="",
+            kernel_params=kernel_params,
+            bootloader=bootloader,
+            passthrough_gpu=None,
+            boot_gpu=boot_gpu,
+            warnings=warnings,
+            errors=errors,
+        )
+
     def _get_vfio_ids(self, gpu: GPUDevice, group: Optional[IOMMUGroup]) -> List[str]:
         """Get all PCI IDs that should be bound to vfio-pci."""
-        ids = [gpu.vfio_ids]
+        # dict as an insertion-ordered set: the GPU's own ID stays first
+        ids = dict.fromkeys((gpu.vfio_ids,))
 
         if group:
-            for device in group.passthrough_devices:
-                # Add audio controllers and other devices in the same group
-                if device.pci_address != gpu.pci_address:
-                    vfio_id = device.vfio_ids
-                    if vfio_id not in ids:
-                        ids.append(vfio_id)
+            # Add audio controllers and other devices in the same group
+            ids.update(dict.fromkeys(
+                device.vfio_ids
+                for device in group.passthrough_devices
+                if device.pci_address != gpu.pci_address
+            ))
 
-        return ids
+        return list(ids)
 
     def _generate_vfio_conf(self, pci_ids: List[str], gpu: GPUDevice) -> str:
         """Generate /etc/modprobe.d/vfio.conf content."""
         ids_str = ",".join(pci_ids)
-
-        content = f"""# NeuronOS VFIO Configuration
-# Auto-generated for GPU passthrough
-# Target GPU: {gpu.vendor_name} {gpu.device_name}
-# PCI Address: {gpu.pci_address}
-#
-# This file binds the discrete GPU to the vfio-pci driver at boot,
-# making it available for VM passthrough instead of the host.
-
-# Bind these devices to vfio-pci driver
-options vfio-pci ids={ids_str}
-
-# Ensure vfio-pci loads before any GPU drivers
-# This prevents the GPU driver from claiming the device first
-softdep nvidia pre: vfio-pci
-softdep nvidia_drm pre: vfio-pci
-softdep nvidia_modeset pre: vfio-pci
-softdep nouveau pre: vfio-pci
-softdep amdgpu pre: vfio-pci
-softdep radeon pre: vfio-pci
-softdep i915 pre: vfio-pci
-
-# Blacklist the GPU driver for the passthrough device (optional)
-# Uncomment if needed:
-# blacklist nouveau
-# blacklist nvidia
-"""
-        return content
+        return _VFIO_CONF_TEMPLATE % (
+            gpu.vendor_name, gpu.device_name, gpu.pci_address, ids_str,
+        )
 
     def _generate_mkinitcpio(self) -> str:
         """Generate MODULES line for mkinitcpio.conf."""
@@ -244,22 +378,33 @@ softdep i915 pre: vfio-pci
         if dry_run:
             print("=== DRY RUN - No changes will be made ===\n")
 
-        # 1. Write vfio.conf
-        vfio_path = target_root / "etc/modprobe.d/vfio.conf"
-        self._write_file(vfio_path, config.vfio_conf, dry_run)
-
-        # 2. Update mkinitcpio.conf
-        mkinitcpio_path = target_root / "etc/mkinitcpio.conf"
-        self._update_mkinitcpio(mkinitcpio_path, config.mkinitcpio_modules, dry_run)
-
-        # 3. Update bootloader
+        # 1. Update bootloader. This goes first so that grub-mkconfig runs
+        # while the modprobe and mkinitcpio configs are written.
+        grub_mkconfig = None
         if config.bootloader == "grub":
-            self._update_grub(target_root, config.kernel_params, dry_run)
+            grub_mkconfig = self._update_grub(target_root, config.kernel_params, dry_run)
         elif config.bootloader == "systemd-boot":
             self._update_systemd_boot(target_root, config.kernel_params, dry_run)
         else:
             print(f"⚠️  Unknown bootloader. Manually add kernel parameter: {config.kernel_params}")
 
+        etc = os.path.join(os.fspath(target_root), "etc")
+
+        try:
+            # 2. Write vfio.conf
+            vfio_path = os.path.join(etc, "modprobe.d/vfio.conf")
+            self._write_file(vfio_path, config.vfio_conf, dry_run)
+
+            # 3. Update mkinitcpio.conf
+            mkinitcpio_path = os.path.join(etc, "mkinitcpio.conf")
+            self._update_mkinitcpio(mkinitcpio_path, config.mkinitcpio_modules, dry_run)
+        finally:
+            # Always reap grub-mkconfig. It must also finish before the
+            # initramfs is rebuilt: its 10_linux script scans /boot for the
+            # kernel and initramfs images that mkinitcpio rewrites.
+            if grub_mkconfig is not None:
+                self._wait_grub_mkconfig(grub_mkconfig)
+
         # 4. Regenerate initramfs (if not dry run and target is live system)
         if not dry_run and target_root == Path("/"):
             self._regenerate_initramfs()
@@ -279,63 +424,69 @@ softdep i915 pre: vfio-pci
 
         return True
 
-    def _write_file(self, path: Path, content: str, dry_run: bool) -> None:
+    # The file helpers below take plain str (or PathLike) paths and use
+    # os.path/open() directly; no Path objects are built per file.
+
+    def _write_file(self, path: str, content: str, dry_run: bool) -> None:
         """Write a file, creating parent directories if needed."""
         if dry_run:
             print(f"Would write: {path}")
             print(f"Content:\n{content[:200]}...")
             return
 
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(content)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
         print(f"✓ Written: {path}")
 
-    def _update_mkinitcpio(self, path: Path, modules: str, dry_run: bool) -> None:
+    def _update_mkinitcpio(self, path: str, modules: str, dry_run: bool) -> None:
         """Update mkinitcpio.conf with VFIO modules."""
-        if not path.exists():
+        try:
+            with open(path) as f:
+                content = f.read()
+        except FileNotFoundError:
             print(f"⚠️  {path} not found, skipping")
             return
 
-        content = path.read_text()
-
         # Replace MODULES line
         if "MODULES=" in content:
-            new_content = re.sub(
-                r'MODULES=\([^)]*\)',
-                modules,
-                content
-            )
+            new_content = _MODULES_RE.sub(modules, content)
 
             if dry_run:
                 print(f"Would update {path}: MODULES line")
             else:
-                path.write_text(new_content)
+                with open(path, "w") as f:
+                    f.write(new_content)
                 print(f"✓ Updated: {path}")
         else:
             print(f"⚠️  MODULES= not found in {path}")
 
-    def _update_grub(self, target_root: Path, params: str, dry_run: bool) -> None:
-        """Update GRUB configuration."""
+    def _update_grub(
+        self, target_root: Path, params: str, dry_run: bool
+    ) -> Optional[subprocess.Popen]:
+        """
+        Update GRUB configuration.
+
+        Returns:
+            The running grub-mkconfig process, if grub.cfg is being
+            regenerated; pass it to _wait_grub_mkconfig()
+        """
         grub_default = target_root / "etc/default/grub"
 
         if not grub_default.exists():
             print(f"⚠️  {grub_default} not found")
-            return
+            return None
 
         content = grub_default.read_text()
 
         # Check if params already present
         if params in content:
             print("✓ Kernel params already in GRUB config")
-            return
+            return None
 
         # Add to GRUB_CMDLINE_LINUX_DEFAULT
         if 'GRUB_CMDLINE_LINUX_DEFAULT="' in content:
-            new_content = re.sub(
-                r'(GRUB_CMDLINE_LINUX_DEFAULT="[^"]*)',
-                f'\\1 {params}',
-                content
-            )
+            new_content = _GRUB_CMDLINE_RE.sub(rf'\1 {params}', content)
 
             if dry_run:
                 print(f"Would update {grub_default}: add {params}")
@@ -343,29 +494,47 @@ softdep i915 pre: vfio-pci
                 grub_default.write_text(new_content)
                 print(f"✓ Updated: {grub_default}")
 
-                # Regenerate grub.cfg
+                # Regenerate grub.cfg in the background
                 grub_cfg = target_root / "boot/grub/grub.cfg"
                 if grub_cfg.exists():
                     try:
-                        subprocess.run(
+                        return subprocess.Popen(
                             ["grub-mkconfig", "-o", str(grub_cfg)],
-                            check=True,
-                            capture_output=True
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
                         )
-                        print(f"✓ Regenerated: {grub_cfg}")
-                    except subprocess.CalledProcessError as e:
+                    except OSError as e:
                         print(f"⚠️  Failed to regenerate grub.cfg: {e}")
 
+        return None
+
+    def _wait_grub_mkconfig(self, process: subprocess.Popen) -> None:
+        """Wait for a grub-mkconfig started by _update_grub() and report it."""
+        process.communicate()
+        grub_cfg = process.args[-1]
+        if process.returncode == 0:
+            print(f"✓ Regenerated: {grub_cfg}")
+        else:
+            e = subprocess.CalledProcessError(process.returncode, process.args)
+            print(f"⚠️  Failed to regenerate grub.cfg: {e}")
+
     def _update_systemd_boot(self, target_root: Path, params: str, dry_run: bool) -> None:
         """Update systemd-boot configuration."""
-        entries_dir = target_root / "boot/loader/entries"
+        entries_dir = os.path.join(os.fspath(target_root), "boot/loader/entries")
 
-        if not entries_dir.exists():
+        try:
+            with os.scandir(entries_dir) as it:
+                entries = [
+                    entry for entry in it
+                    if entry.name.endswith(".conf") and entry.is_file()
+                ]
+        except FileNotFoundError:
             print(f"⚠️  {entries_dir} not found")
             return
 
-        for entry in entries_dir.glob("*.conf"):
-            content = entry.read_text()
+        for entry in entries:
+            with open(entry.path) as f:
+                content = f.read()
 
             # Check if params already present
             if params in content:
@@ -373,19 +542,14 @@ softdep i915 pre: vfio-pci
                 continue
 
             # Add to options line
-            lines = content.split("\n")
-            new_lines = []
-
-            for line in lines:
-                if line.strip().startswith("options "):
-                    line = f"{line} {params}"
-                new_lines.append(line)
+            new_content = _OPTIONS_LINE_RE.sub(rf'\1 {params}', content)
 
             if dry_run:
-                print(f"Would update {entry}: add {params}")
+                print(f"Would update {entry.path}: add {params}")
             else:
-                entry.write_text("\n".join(new_lines))
-                print(f"✓ Updated: {entry}")
+                with open(entry.path, "w") as f:
+                    f.write(new_content)
+                print(f"✓ Updated: {entry.path}")
 
     def _regenerate_initramfs(self) -> None:
         """Regenerate initramfs after config changes."""
@@ -405,42 +569,47 @@ softdep i915 pre: vfio-pci
         """Print generated configuration without applying."""
         config = self.detect_and_generate()
 
-        print("=== NeuronOS VFIO Configuration Generator ===\n")
+        # Built up and written once rather than one print() per line
+        lines = ["=== NeuronOS VFIO Configuration Generator ===\n"]
+        add = lines.append
 
         if config.errors:
-            print("❌ ERRORS:")
+            add("❌ ERRORS:")
             for error in config.errors:
-                print(f"   - {error}")
-            print()
+                add(f"   - {error}")
+            add("")
 
         if config.passthrough_gpu:
-            print(f"Passthrough GPU: {config.passthrough_gpu.pci_address}")
-            print(f"  {config.passthrough_gpu.vendor_name} {config.passthrough_gpu.device_name}")
-            print()
+            add(f"Passthrough GPU: {config.passthrough_gpu.pci_address}")
+            add(f"  {config.passthrough_gpu.vendor_name} {config.passthrough_gpu.device_name}")
+            add("")
 
         if config.boot_gpu:
-            print(f"Host Display GPU: {config.boot_gpu.pci_address}")
-            print(f"  {config.boot_gpu.vendor_name} {config.boot_gpu.device_name}")
-            print()
+            add(f"Host Display GPU: {config.boot_gpu.pci_address}")
+            add(f"  {config.boot_gpu.vendor_name} {config.boot_gpu.device_name}")
+            add("")
 
-        print(f"Detected Bootloader: {config.bootloader}")
-        print()
+        add(f"Detected Bootloader: {config.bootloader}")
+        add("")
 
-        print("--- /etc/modprobe.d/vfio.conf ---")
-        print(config.vfio_conf)
+        add("--- /etc/modprobe.d/vfio.conf ---")
+        add(config.vfio_conf)
 
-        print("--- mkinitcpio.conf MODULES ---")
-        print(config.mkinitcpio_modules)
-        print()
+        add("--- mkinitcpio.conf MODULES ---")
+        add(config.mkinitcpio_modules)
+        add("")
 
-        print("--- Kernel Parameters ---")
-        print(config.kernel_params)
-        print()
+        add("--- Kernel Parameters ---")
+        add(config.kernel_params)
+        add("")
 
         if config.warnings:
-            print("⚠️  WARNINGS:")
+            add("⚠️  WARNINGS:")
             for warning in config.warnings:
-                print(f"   - {warning}")
+                add(f"   - {warning}")
+
+        add("")
+        sys.stdout.write("\n".join(lines))
 
 
 def main():
@@ -8,9 +8,33 @@ Detects CPU capabilities for VFIO configuration, specifically:
 - Required kernel parameters
 """
 
+import os
+import re
 import subprocess
+import sys
 from pathlib import Path
 from dataclasses import dataclass
+from typing import Optional
+
+# "key<tabs> : value" lines of a /proc/cpuinfo stanza
+_CPUINFO_FIELD_RE = re.compile(r"^[ \t]*([^:\n]+?)[ \t]*:[ \t]*(.*?)[ \t]*$", re.M)
+
+
+def _read_proc_file(path) -> bytes:
+    """
+    Read a small /proc file with plain os.read() calls.
+
+    /proc files report a size of 0, so this reads until EOF instead of
+    going through a buffered text file object.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        while chunk := os.read(fd, 65536):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b"".join(chunks)
 
 
 @dataclass
@@ -41,10 +65,33 @@ class CPUDetector:
     """Detects CPU capabilities for VFIO configuration."""
 
     CPUINFO_PATH = Path("/proc/cpuinfo")
+    CMDLINE_PATH = Path("/proc/cmdline")
     DMESG_PATH = Path("/var/log/dmesg")
+    KMSG_PATH = "/dev/kmsg"
+    IOMMU_GROUPS_PATH = Path("/sys/kernel/iommu_groups")
+
+    # Kernel log messages showing IOMMU initialization
+    IOMMU_LOG_INDICATORS = (
+        b"IOMMU enabled",
+        b"AMD-Vi: Interrupt remapping enabled",
+        b"Intel-IOMMU: enabled",
+        b"DMAR: IOMMU enabled",
+    )
+
+    def __init__(self):
+        self._cached: Optional[CPUInfo] = None
 
     def detect(self) -> CPUInfo:
-        """Detect CPU information."""
+        """Detect CPU information (cached after the first call)."""
+        if self._cached is None:
+            self._cached = self._detect_uncached()
+        return self._cached
+
+    def invalidate(self) -> None:
+        """Discard the cached CPUInfo, e.g. after the kernel config changed."""
+        self._cached = None
+
+    def _detect_uncached(self) -> CPUInfo:
         # Parse /proc/cpuinfo
         cpuinfo = self._parse_cpuinfo()
 
@@ -78,8 +125,9 @@ class CPUDetector:
             total_threads = processor_count
 
         # Check CPU flags for virtualization support
-        flags = cpuinfo.get("flags", "").split()
-        has_virt = "vmx" in flags or "svm" in flags
+        # Pad with spaces so substring tests only match whole flags
+        flags = f" {cpuinfo.get('flags', '')} "
+        has_virt = " vmx " in flags or " svm " in flags
 
         # Determine IOMMU kernel parameter
         if vendor == "Intel":
@@ -111,22 +159,20 @@ class CPUDetector:
         result = {"_processor_count": 0}
 
         try:
-            content = self.CPUINFO_PATH.read_text()
+            raw = _read_proc_file(self.CPUINFO_PATH)
         except IOError:
             return result
 
-        for line in content.split("\n"):
-            if line.startswith("processor"):
-                result["_processor_count"] += 1
-
-            if ":" in line:
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip()
+        result["_processor_count"] = (
+            raw.count(b"\nprocessor") + raw.startswith(b"processor")
+        )
 
-                # Only store first occurrence (all cores have same info)
-                if key not in result or key == "_processor_count":
-                    result[key] = value
+        # All cores report the same info, so only the first stanza is
+        # decoded and parsed
+        first_block = raw.partition(b"\n\n")[0].decode("utf-8", "replace")
+        for match in _CPUINFO_FIELD_RE.finditer(first_block):
+            key, value = match.groups()
+            result.setdefault(key, value)
 
         return result
 
@@ -134,49 +180,89 @@ class CPUDetector:
         """Check if IOMMU is currently enabled in the kernel."""
         # Check kernel command line
         try:
-            cmdline = Path("/proc/cmdline").read_text()
-            if "intel_iommu=on" in cmdline or "amd_iommu=on" in cmdline:
-                # Also verify in dmesg
+            cmdline = _read_proc_file(self.CMDLINE_PATH)
+            if b"intel_iommu=on" in cmdline or b"amd_iommu=on" in cmdline:
+                # Verify the kernel actually set up IOMMU groups; dmesg is
+                # only consulted when sysfs is not available
+                groups_present = self._iommu_groups_present()
+                if groups_present is not None:
+                    return groups_present
                 return self._verify_iommu_dmesg()
         except IOError:
             pass
 
         return False
 
-    def _verify_iommu_dmesg(self) -> bool:
-        """Verify IOMMU is actually working by checking dmesg."""
+    def _iommu_groups_present(self) -> Optional[bool]:
+        """
+        Check whether the kernel has created any IOMMU groups.
+
+        Returns:
+            True/False from sysfs, or None if the sysfs directory is missing
+        """
         try:
-            result = subprocess.run(
-                ["dmesg"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            with os.scandir(self.IOMMU_GROUPS_PATH) as it:
+                return any(True for _ in it)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            return False
 
-            output = result.stdout
+    def _verify_iommu_dmesg(self) -> bool:
+        """Verify IOMMU is actually working by checking the kernel log."""
+        for read_log in (self._read_dmesg_file, self._read_kmsg, self._run_dmesg):
+            log = read_log()
+            if log:
+                return any(indicator in log for indicator in self.IOMMU_LOG_INDICATORS)
 
-            # Look for IOMMU initialization messages
-            indicators = [
-                "IOMMU enabled",
-                "AMD-Vi: Interrupt remapping enabled",
-                "Intel-IOMMU: enabled",
-                "DMAR: IOMMU enabled",
-            ]
+        return False
 
-            for indicator in indicators:
-                if indicator in output:
-                    return True
+    def _read_dmesg_file(self) -> bytes:
+        """Read the boot log saved by the init system, if any."""
+        try:
+            return self.DMESG_PATH.read_bytes()
+        except OSError:
+            return b""
 
-        except (subprocess.TimeoutExpired, subprocess.SubprocessError):
+    def _read_kmsg(self) -> bytes:
+        """Drain the records currently in the kernel ring buffer."""
+        try:
+            fd = os.open(self.KMSG_PATH, os.O_RDONLY | os.O_NONBLOCK)
+        except OSError:
+            # Missing, or dmesg_restrict without CAP_SYSLOG
+            return b""
+
+        records = []
+        try:
+            while True:
+                try:
+                    record = os.read(fd, 8192)
+                except BrokenPipeError:
+                    # Record was overwritten while reading; skip to the next
+                    continue
+                except BlockingIOError:
+                    break
+                if not record:
+                    break
+                records.append(record)
+        except OSError:
             pass
+        finally:
+            os.close(fd)
 
-        # Fallback: check if iommu_groups exist
-        iommu_groups = Path("/sys/kernel/iommu_groups")
-        if iommu_groups.exists():
-            groups = list(iommu_groups.iterdir())
-            return len(groups) > 0
+        return b"".join(records)
 
-        return False
+    def _run_dmesg(self) -> bytes:
+        """Fall back to the dmesg binary."""
+        try:
+            result = subprocess.run(
+                ["dmesg"],
+                capture_output=True,
+                timeout=10
+            )
+            return result.stdout
+        except (OSError, subprocess.SubprocessError):
+            return b""
 
     def check_bios_settings(self) -> dict:
         """
@@ -216,28 +302,36 @@ class CPUDetector:
         """Print a summary of CPU capabilities."""
         cpu = self.detect()
 
-        print("=== CPU Detection ===\n")
-        print(f"Vendor: {cpu.vendor}")
-        print(f"Model:  {cpu.model_name}")
-        print(f"Cores:  {cpu.cores} physical, {cpu.threads} threads")
-        print()
-        print("=== Virtualization Support ===\n")
+        # Built up and written once rather than one print() per line
+        lines = [
+            "=== CPU Detection ===\n",
+            f"Vendor: {cpu.vendor}",
+            f"Model:  {cpu.model_name}",
+            f"Cores:  {cpu.cores} physical, {cpu.threads} threads",
+            "",
+            "=== Virtualization Support ===\n",
+        ]
 
         virt_status = "✅ Enabled" if cpu.has_virtualization else "❌ Not detected"
         iommu_status = "✅ Enabled" if cpu.iommu_enabled else "⚠️  Not enabled"
 
-        print(f"{'VT-x' if cpu.is_intel else 'SVM'}: {virt_status}")
-        print(f"{'VT-d' if cpu.is_intel else 'AMD-Vi'}: {iommu_status}")
+        lines.append(f"{'VT-x' if cpu.is_intel else 'SVM'}: {virt_status}")
+        lines.append(f"{'VT-d' if cpu.is_intel else 'AMD-Vi'}: {iommu_status}")
 
         if not cpu.iommu_enabled:
-            print()
-            print("⚠️  IOMMU is not enabled!")
-            print()
-            print("To enable, add this to your kernel command line:")
-            print(f"    {cpu.iommu_param}")
-            print()
-            print("For GRUB, edit /etc/default/grub and run grub-mkconfig")
-            print("For systemd-boot, edit /boot/loader/entries/*.conf")
+            lines += [
+                "",
+                "⚠️  IOMMU is not enabled!",
+                "",
+                "To enable, add this to your kernel command line:",
+                f"    {cpu.iommu_param}",
+                "",
+                "For GRUB, edit /etc/default/grub and run grub-mkconfig",
+                "For systemd-boot, edit /boot/loader/entries/*.conf",
+            ]
+
+        lines.append("")
+        sys.stdout.write("\n".join(lines))
 
 
 def main():
@@ -8,13 +8,40 @@ This is the core component for automatic VFIO configuration.
 
 import os
 import json
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dataclasses import dataclass, asdict
-from typing import List, Optional
+from dataclasses import dataclass, fields
+from typing import List, Optional, Tuple, Union
 
+from . import pci_ids_db
 
-@dataclass
+try:
+    import pyudev
+    PYUDEV_AVAILABLE = True
+except ImportError:
+    PYUDEV_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+if ORJSON_AVAILABLE:
+    def _json_dumps_indented(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+else:
+    def _json_dumps_indented(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+# Worker threads for per-device sysfs reads (they block in syscalls, which
+# release the GIL)
+_SYSFS_WORKERS = 8
+
+
+@dataclass(slots=True)
 class GPUDevice:
     """Represents a detected GPU device."""
 
@@ -53,11 +80,23 @@ class GPUDevice:
         return f"{self.vendor_id}:{self.device_id}"
 
 
+_GPU_FIELDS = tuple(f.name for f in fields(GPUDevice))
+
+
+def _to_dict(gpu: GPUDevice) -> dict:
+    """Flat dict of a GPUDevice's fields (asdict() without the deep copy)."""
+    return {name: getattr(gpu, name) for name in _GPU_FIELDS}
+
+
+_SYSFS_PCI_DEVICES = Path("/sys/bus/pci/devices")
+
+
 class GPUScanner:
     """Scans system for GPU devices."""
 
-    PCI_DEVICE_PATH = Path("/sys/bus/pci/devices")
-    PCI_IDS_PATH = Path("/usr/share/hwdata/pci.ids")
+    # udev only describes the live system, so overriding this (e.g. to scan
+    # a copied sysfs tree) always uses the sysfs walk
+    PCI_DEVICE_PATH = _SYSFS_PCI_DEVICES
 
     # PCI class codes for display devices
     VGA_CLASS = "0x030000"      # VGA compatible controller
@@ -65,113 +104,180 @@ class GPUScanner:
     DISPLAY_CLASS_PREFIX = "0x0300"  # Any display class
 
     def __init__(self):
-        self.devices: List[GPUDevice] = []
-        self._pci_ids_cache: dict = {}
-        self._load_pci_ids()
-
-    def _load_pci_ids(self) -> None:
-        """Load PCI vendor/device names from pci.ids database."""
-        # Fallback vendor names
-        self._pci_ids_cache = {
-            "vendors": {
-                "10de": "NVIDIA Corporation",
-                "1002": "Advanced Micro Devices, Inc. [AMD/ATI]",
-                "8086": "Intel Corporation",
-                "1022": "Advanced Micro Devices, Inc. [AMD]",
-            },
-            "devices": {}
-        }
-
-        # Try to load full database
-        if self.PCI_IDS_PATH.exists():
-            try:
-                self._parse_pci_ids(self.PCI_IDS_PATH)
-            except Exception:
-                pass  # Use fallback
-
-    def _parse_pci_ids(self, path: Path) -> None:
-        """Parse pci.ids file for vendor/device names."""
-        current_vendor = None
-
-        with open(path, 'r', errors='ignore') as f:
-            for line in f:
-                # Skip comments and empty lines
-                if line.startswith('#') or not line.strip():
-                    continue
-
-                # Vendor line (no leading whitespace)
-                if not line.startswith('\t') and not line.startswith(' '):
-                    parts = line.strip().split(None, 1)
-                    if len(parts) >= 2:
-                        vendor_id = parts[0].lower()
-                        vendor_name = parts[1].strip()
-                        self._pci_ids_cache["vendors"][vendor_id] = vendor_name
-                        current_vendor = vendor_id
-
-                # Device line (single tab)
-                elif line.startswith('\t') and not line.startswith('\t\t'):
-                    if current_vendor:
-                        parts = line.strip().split(None, 1)
-                        if len(parts) >= 2:
-                            device_id = parts[0].lower()
-                            device_name = parts[1].strip()
-                            key = f"{current_vendor}:{device_id}"
-                            self._pci_ids_cache["devices"][key] = device_name
+        self._devices: List[GPUDevice] = []
+        # (boot GPU, passthrough candidate), worked out on first use
+        self._selection: Optional[Tuple[Optional[GPUDevice], Optional[GPUDevice]]] = None
+        # Set once scan() has seen the boot VGA; there is only one
+        self._boot_vga_found = False
+        self._db = pci_ids_db.load()
+
+    @property
+    def devices(self) -> List[GPUDevice]:
+        """GPUs found by the last scan()."""
+        return self._devices
+
+    @devices.setter
+    def devices(self, devices: List[GPUDevice]) -> None:
+        # Assign a new list rather than mutating this one, so that the
+        # memoized boot GPU / passthrough candidate are recomputed
+        self._devices = devices
+        self._selection = None
 
     def scan(self) -> List[GPUDevice]:
         """Scan all PCI devices for GPUs."""
         self.devices = []
+        self._boot_vga_found = False
 
-        if not self.PCI_DEVICE_PATH.exists():
-            return self.devices
+        gpus = None
+        if PYUDEV_AVAILABLE and self.PCI_DEVICE_PATH == _SYSFS_PCI_DEVICES:
+            try:
+                gpus = self._scan_udev()
+            except (ImportError, OSError) as e:
+                # libudev missing or unusable, e.g. in a chroot or container
+                print(f"Warning: udev enumeration failed, reading sysfs: {e}")
+                self._boot_vga_found = False
+        if gpus is None:
+            gpus = self._scan_sysfs()
+        gpus = [gpu for gpu in gpus if gpu]
 
-        for device_path in self.PCI_DEVICE_PATH.iterdir():
-            if not device_path.is_dir():
-                continue
+        # Sort: boot VGA first, then by PCI address
+        gpus.sort(key=lambda g: (not g.is_boot_vga, g.pci_address))
 
-            class_path = device_path / "class"
-            if not class_path.exists():
-                continue
+        self.devices = gpus
+        return self.devices
+
+    def _scan_udev(self) -> List[Optional[GPUDevice]]:
+        """
+        Find GPUs through udev.
 
+        The class, IDs and driver of every PCI device come from the udev
+        database in one enumeration, so only boot_vga and iommu_group are
+        still read from sysfs, and only for display devices.
+        """
+        gpus = []
+        for device in pyudev.Context().list_devices(subsystem="pci"):
             try:
-                device_class = class_path.read_text().strip()
-            except (IOError, PermissionError):
+                # PCI_CLASS is unpadded hex, e.g. "30000"
+                device_class = f"0x{int(device.get('PCI_CLASS', ''), 16):06x}"
+            except ValueError:
                 continue
 
             # Check if VGA or 3D controller
             if device_class.startswith(self.DISPLAY_CLASS_PREFIX):
-                gpu = self._parse_device(device_path)
-                if gpu:
-                    self.devices.append(gpu)
+                gpus.append(self._parse_udev_device(device, device_class))
+        return gpus
 
-        # Sort: boot VGA first, then by PCI address
-        self.devices.sort(key=lambda g: (not g.is_boot_vga, g.pci_address))
+    def _parse_udev_device(self, device, device_class: str) -> Optional[GPUDevice]:
+        """Parse a pyudev PCI device."""
+        pci_address = device.sys_name
+        try:
+            dir_fd = os.open(device.sys_path, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError as e:
+            print(f"Warning: Failed to parse {pci_address}: {e}")
+            return None
 
-        return self.devices
+        try:
+            is_boot_vga = self._read_boot_vga(dir_fd)
+            iommu_group = self._get_iommu_group(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+        # "10DE:2484" -> ("10de", "2484")
+        vendor_id, _, device_id = device.get("PCI_ID", "").lower().partition(":")
+        subsystem_vendor, _, subsystem_device = (
+            device.get("PCI_SUBSYS_ID", "").lower().partition(":")
+        )
+
+        return GPUDevice(
+            pci_address=pci_address,
+            vendor_id=vendor_id,
+            device_id=device_id,
+            vendor_name=self._lookup_vendor(vendor_id),
+            device_name=self._lookup_device(vendor_id, device_id),
+            subsystem_vendor=subsystem_vendor,
+            subsystem_device=subsystem_device,
+            is_boot_vga=is_boot_vga,
+            iommu_group=iommu_group,
+            driver_in_use=device.get("DRIVER"),
+            device_class=device_class[2:6],
+        )
+
+    def _scan_sysfs(self) -> List[Optional[GPUDevice]]:
+        """Find GPUs by walking PCI_DEVICE_PATH."""
+        # Every read below is resolved relative to the bus directory, which
+        # is opened once, instead of walking the full /sys path each time.
+        # Paths stay bytes (sysfs names are ASCII) so no str is encoded for
+        # each syscall; only the final PCI address gets decoded.
+        bus_path = os.fsencode(self.PCI_DEVICE_PATH)
+        try:
+            bus_fd = os.open(bus_path, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return []
+
+        try:
+            names = []
+            classes = []
+            with os.scandir(bus_path) as entries:
+                for entry in entries:
+                    if not entry.is_dir():
+                        continue
+
+                    device_class = self._read_sysfs(entry.name + b"/class", bus_fd)
+
+                    # Check if VGA or 3D controller
+                    if device_class.startswith(self.DISPLAY_CLASS_PREFIX):
+                        names.append(entry.name)
+                        classes.append(device_class)
+
+            if len(names) > 1:
+                with ThreadPoolExecutor(max_workers=min(_SYSFS_WORKERS, len(names))) as executor:
+                    return list(executor.map(self._parse_device, names, classes,
+                                             [bus_fd] * len(names)))
+            return [self._parse_device(n, c, bus_fd) for n, c in zip(names, classes)]
+        except OSError:
+            return []
+        finally:
+            os.close(bus_fd)
+
+    def _parse_device(self, device_path: Union[str, bytes], device_class: str,
+                      parent_fd: Optional[int] = None) -> Optional[GPUDevice]:
+        """
+        Parse a single PCI device.
+
+        Args:
+            device_path: sysfs directory of the device
+            device_class: Contents of its class attribute, as read by scan()
+            parent_fd: Directory fd that a relative device_path is resolved
+                against
+        """
+        pci_address = os.fsdecode(os.path.basename(device_path))
 
-    def _parse_device(self, device_path: Path) -> Optional[GPUDevice]:
-        """Parse a single PCI device."""
-        pci_address = device_path.name
+        # Attributes are opened relative to the device directory, so the
+        # kernel resolves the /sys path once instead of once per file
+        try:
+            dir_fd = os.open(device_path, os.O_RDONLY | os.O_DIRECTORY, dir_fd=parent_fd)
+        except OSError as e:
+            print(f"Warning: Failed to parse {pci_address}: {e}")
+            return None
 
         try:
             # Read basic info
-            vendor_id = self._read_sysfs(device_path / "vendor").replace("0x", "")
-            device_id = self._read_sysfs(device_path / "device").replace("0x", "")
-            device_class = self._read_sysfs(device_path / "class").replace("0x", "")[:4]
+            vendor_id = self._read_sysfs_id(b"vendor", dir_fd)
+            device_id = self._read_sysfs_id(b"device", dir_fd)
+            device_class = device_class[2:6]  # "0x030000" -> "0300"
 
             # Read subsystem info
-            subsystem_vendor = self._read_sysfs(device_path / "subsystem_vendor").replace("0x", "")
-            subsystem_device = self._read_sysfs(device_path / "subsystem_device").replace("0x", "")
+            subsystem_vendor = self._read_sysfs_id(b"subsystem_vendor", dir_fd)
+            subsystem_device = self._read_sysfs_id(b"subsystem_device", dir_fd)
 
             # Check if boot VGA
-            boot_vga_path = device_path / "boot_vga"
-            is_boot_vga = boot_vga_path.exists() and self._read_sysfs(boot_vga_path) == "1"
+            is_boot_vga = self._read_boot_vga(dir_fd)
 
             # Get IOMMU group
-            iommu_group = self._get_iommu_group(device_path)
+            iommu_group = self._get_iommu_group(dir_fd)
 
             # Get current driver
-            driver_in_use = self._get_driver(device_path)
+            driver_in_use = self._get_driver(dir_fd)
 
             # Get human-readable names
             vendor_name = self._lookup_vendor(vendor_id)
@@ -179,12 +285,12 @@ class GPUScanner:
 
             return GPUDevice(
                 pci_address=pci_address,
-                vendor_id=vendor_id.lower(),
-                device_id=device_id.lower(),
+                vendor_id=vendor_id,
+                device_id=device_id,
                 vendor_name=vendor_name,
                 device_name=device_name,
-                subsystem_vendor=subsystem_vendor.lower(),
-                subsystem_device=subsystem_device.lower(),
+                subsystem_vendor=subsystem_vendor,
+                subsystem_device=subsystem_device,
                 is_boot_vga=is_boot_vga,
                 iommu_group=iommu_group,
                 driver_in_use=driver_in_use,
@@ -194,69 +300,102 @@ class GPUScanner:
         except Exception as e:
             print(f"Warning: Failed to parse {pci_address}: {e}")
             return None
+        finally:
+            os.close(dir_fd)
+
+    def _read_sysfs(self, path: Union[str, bytes], dir_fd: Optional[int] = None) -> str:
+        """
+        Read a sysfs file safely.
 
-    def _read_sysfs(self, path: Path) -> str:
-        """Read a sysfs file safely."""
+        Sysfs attributes are single short values, so one pread() on a raw
+        fd is enough and skips the buffered/text file layers. A relative
+        path is resolved against dir_fd when given.
+        """
+        try:
+            fd = os.open(path, os.O_RDONLY, dir_fd=dir_fd)
+        except OSError:
+            return ""
         try:
-            return path.read_text().strip()
-        except (IOError, PermissionError):
+            return os.pread(fd, 4096, 0).decode("ascii", "replace").strip()
+        except OSError:
             return ""
+        finally:
+            os.close(fd)
 
-    def _get_iommu_group(self, device_path: Path) -> int:
-        """Get the IOMMU group number for a device."""
-        iommu_link = device_path / "iommu_group"
-        if iommu_link.exists():
-            try:
-                target = os.readlink(iommu_link)
-                return int(os.path.basename(target))
-            except (OSError, ValueError):
-                pass
-        return -1
-
-    def _get_driver(self, device_path: Path) -> Optional[str]:
-        """Get the current driver for a device."""
-        driver_path = device_path / "driver"
-        if driver_path.exists():
-            try:
-                target = os.readlink(driver_path)
-                return os.path.basename(target)
-            except OSError:
-                pass
-        return None
+    def _read_boot_vga(self, dir_fd: int) -> bool:
+        """
+        Check the boot_vga attribute of the device open at dir_fd.
+
+        Only one device can be the boot VGA, so once it has been found the
+        remaining devices are not read at all. With the parallel scan a
+        device may still be read before the flag is seen, which only costs
+        the read.
+        """
+        if self._boot_vga_found:
+            return False
+        # A missing file reads as ""
+        if self._read_sysfs(b"boot_vga", dir_fd) == "1":
+            self._boot_vga_found = True
+            return True
+        return False
+
+    def _read_sysfs_id(self, name: bytes, dir_fd: int) -> str:
+        """Read a hex ID attribute such as "0x10DE" as bare lowercase hex."""
+        return self._read_sysfs(name, dir_fd).removeprefix("0x").lower()
+
+    def _get_iommu_group(self, dir_fd: int) -> int:
+        """Get the IOMMU group number for the device open at dir_fd."""
+        try:
+            # e.g. b"../../../../kernel/iommu_groups/14"
+            target = os.readlink(b"iommu_group", dir_fd=dir_fd)
+            return int(target.rpartition(b"/")[2])
+        except (OSError, ValueError):
+            return -1
+
+    def _get_driver(self, dir_fd: int) -> Optional[str]:
+        """Get the current driver for the device open at dir_fd."""
+        try:
+            target = os.readlink(b"driver", dir_fd=dir_fd)
+            return os.fsdecode(target.rpartition(b"/")[2])
+        except OSError:
+            return None
 
     def _lookup_vendor(self, vendor_id: str) -> str:
         """Lookup vendor name from PCI IDs database."""
-        vendor_id = vendor_id.lower()
-        return self._pci_ids_cache["vendors"].get(vendor_id, f"Unknown ({vendor_id})")
+        name = self._db.vendor_name(vendor_id)
+        return name if name is not None else f"Unknown ({vendor_id.lower()})"
 
     def _lookup_device(self, vendor_id: str, device_id: str) -> str:
         """Lookup device name from PCI IDs database."""
-        key = f"{vendor_id.lower()}:{device_id.lower()}"
-        if key in self._pci_ids_cache["devices"]:
-            return self._pci_ids_cache["devices"][key]
+        name = self._db.device_name(vendor_id, device_id)
+        return name if name is not None else f"Device {device_id}"
 
-        # Fallback: try lspci
-        try:
-            pci_address = None
-            for gpu in self.devices:
-                if gpu.vendor_id == vendor_id and gpu.device_id == device_id:
-                    pci_address = gpu.pci_address
-                    break
-
-            if pci_address:
-                result = subprocess.run(
-                    ["lspci", "-s", pci_address],
-                    capture_output=True, text=True, timeout=5
-                )
-                if result.returncode == 0:
-                    # Parse output: "01:00.0 VGA compatible controller: NVIDIA Corporation..."
-                    parts = result.stdout.split(": ", 1)
-                    if len(parts) >= 2:
-                        return parts[1].strip()
-        except Exception:
-            pass
-
-        return f"Device {device_id}"
+    def _select_gpus(self) -> Tuple[Optional[GPUDevice], Optional[GPUDevice]]:
+        """Find the boot GPU and the passthrough candidate in one pass."""
+        if self._selection is not None:
+            return self._selection
+
+        boot_gpu = None
+        candidate = None
+        first_discrete = None
+        for gpu in self.devices:
+            if gpu.is_boot_vga and boot_gpu is None:
+                boot_gpu = gpu
+            if gpu.is_discrete:
+                if first_discrete is None:
+                    first_discrete = gpu
+                if candidate is None and not gpu.is_boot_vga:
+                    candidate = gpu
+
+        if boot_gpu is None and self.devices:
+            boot_gpu = self.devices[0]
+        # If all discrete GPUs are boot VGA, we need single-GPU passthrough
+        # This is more complex and requires the boot GPU
+        if candidate is None:
+            candidate = first_discrete
+
+        self._selection = (boot_gpu, candidate)
+        return self._selection
 
     def get_passthrough_candidate(self) -> Optional[GPUDevice]:
         """
@@ -267,30 +406,15 @@ class GPUScanner:
         2. The boot VGA (primary display) should stay on Linux
         3. Non-boot-VGA discrete GPU is ideal for passthrough
         """
-        # First, find non-boot discrete GPUs (ideal)
-        for gpu in self.devices:
-            if not gpu.is_boot_vga and gpu.is_discrete:
-                return gpu
-
-        # If all discrete GPUs are boot VGA, we need single-GPU passthrough
-        # This is more complex and requires the boot GPU
-        for gpu in self.devices:
-            if gpu.is_discrete:
-                return gpu
-
-        # No discrete GPU found
-        return None
+        return self._select_gpus()[1]
 
     def get_boot_gpu(self) -> Optional[GPUDevice]:
         """Get the GPU currently used for the primary display."""
-        for gpu in self.devices:
-            if gpu.is_boot_vga:
-                return gpu
-        return self.devices[0] if self.devices else None
+        return self._select_gpus()[0]
 
     def to_json(self) -> str:
         """Export scan results as JSON."""
-        return json.dumps([asdict(d) for d in self.devices], indent=2)
+        return _json_dumps_indented([_to_dict(d) for d in self.devices])
 
     def print_summary(self) -> None:
         """Print a human-readable summary of detected GPUs."""
@@ -7,13 +7,55 @@ IOMMU groups are critical for safe device passthrough - all devices
 in a group must be passed through together.
 """
 
-import subprocess
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 
-
-@dataclass
+from . import pci_ids_db
+
+# Worker threads for per-device sysfs reads (they block in syscalls, which
+# release the GIL)
+_SYSFS_WORKERS = 8
+
+# PCI class/subclass codes to the names lspci prints for them
+_PCI_CLASS_NAMES = {
+    "0000": "Non-VGA unclassified device",
+    "0100": "SCSI storage controller",
+    "0101": "IDE interface",
+    "0104": "RAID bus controller",
+    "0106": "SATA controller",
+    "0107": "Serial Attached SCSI controller",
+    "0108": "Non-Volatile memory controller",
+    "0200": "Ethernet controller",
+    "0280": "Network controller",
+    "0300": "VGA compatible controller",
+    "0302": "3D controller",
+    "0380": "Display controller",
+    "0400": "Multimedia video controller",
+    "0401": "Multimedia audio controller",
+    "0403": "Audio device",
+    "0480": "Multimedia controller",
+    "0500": "RAM memory",
+    "0580": "Memory controller",
+    "0600": "Host bridge",
+    "0601": "ISA bridge",
+    "0604": "PCI bridge",
+    "0680": "Bridge",
+    "0700": "Serial controller",
+    "0780": "Communication controller",
+    "0805": "SD Host controller",
+    "0880": "System peripheral",
+    "0c03": "USB controller",
+    "0c05": "SMBus",
+    "0c80": "Serial bus controller",
+    "1080": "Encryption controller",
+    "1180": "Signal processing controller",
+}
+
+
+@dataclass(slots=True)
 class IOMMUDevice:
     """A device within an IOMMU group."""
 
@@ -22,7 +64,7 @@ class IOMMUDevice:
     class_name: str         # e.g., "VGA compatible controller"
     vendor_id: str          # e.g., "10de"
     device_id: str          # e.g., "1c03"
-    description: str        # Full lspci description
+    description: str        # lspci-style one-line description
 
     @property
     def is_gpu(self) -> bool:
@@ -116,10 +158,12 @@ class IOMMUParser:
     """Parses and analyzes IOMMU groups."""
 
     IOMMU_PATH = Path("/sys/kernel/iommu_groups")
+    PCI_DEVICES_PATH = Path("/sys/bus/pci/devices")
 
     def __init__(self):
         self.groups: Dict[int, IOMMUGroup] = {}
         self._iommu_enabled: bool = False
+        self._db = pci_ids_db.load()
 
     @property
     def is_iommu_enabled(self) -> bool:
@@ -134,107 +178,116 @@ class IOMMUParser:
         """
         self.groups = {}
 
-        if not self.IOMMU_PATH.exists():
+        try:
+            with os.scandir(self.IOMMU_PATH) as entries:
+                group_names = [entry.name for entry in entries if entry.name.isdigit()]
+        except OSError:
             self._iommu_enabled = False
             return self.groups
 
         self._iommu_enabled = True
 
         # Sort numerically
-        group_dirs = sorted(
-            self.IOMMU_PATH.iterdir(),
-            key=lambda x: int(x.name) if x.name.isdigit() else 0
-        )
-
-        for group_dir in group_dirs:
-            if not group_dir.name.isdigit():
-                continue
-
-            group_id = int(group_dir.name)
-            devices = []
-
-            devices_path = group_dir / "devices"
-            if devices_path.exists():
-                for device_link in devices_path.iterdir():
-                    pci_addr = device_link.name
-                    device = self._get_device_info(pci_addr)
-                    if device:
-                        devices.append(device)
-
+        group_names.sort(key=int)
+
+        # List every group's devices first, then read them all at once
+        group_addrs = []
+        for name in group_names:
+            try:
+                addrs = os.listdir(os.path.join(self.IOMMU_PATH, name, "devices"))
+            except OSError:
+                addrs = []
+            group_addrs.append((int(name), addrs))
+
+        all_addrs = [addr for _, addrs in group_addrs for addr in addrs]
+        try:
+            bus_fd = os.open(self.PCI_DEVICES_PATH, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            bus_fd = None
+        try:
+            if len(all_addrs) > 1:
+                with ThreadPoolExecutor(max_workers=min(_SYSFS_WORKERS, len(all_addrs))) as executor:
+                    infos = list(executor.map(self._get_device_info, all_addrs,
+                                              [bus_fd] * len(all_addrs)))
+            else:
+                infos = [self._get_device_info(addr, bus_fd) for addr in all_addrs]
+        finally:
+            if bus_fd is not None:
+                os.close(bus_fd)
+
+        start = 0
+        for group_id, addrs in group_addrs:
+            end = start + len(addrs)
             self.groups[group_id] = IOMMUGroup(
                 group_id=group_id,
-                devices=devices
+                devices=[device for device in infos[start:end] if device]
             )
+            start = end
 
         return self.groups
 
-    def _get_device_info(self, pci_address: str) -> Optional[IOMMUDevice]:
-        """Get device information using lspci."""
-        try:
-            # Run lspci with verbose numeric output
-            result = subprocess.run(
-                ["lspci", "-nns", pci_address],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+    def _get_device_info(self, pci_address: str,
+                         bus_fd: Optional[int] = None) -> Optional[IOMMUDevice]:
+        """Get device information from sysfs.
 
-            if result.returncode != 0:
-                return None
-
-            description = result.stdout.strip()
-            if not description:
-                return None
-
-            # Parse output format:
-            # "01:00.0 VGA compatible controller [0300]: NVIDIA Corporation GP106 [10de:1c03]"
-            # or
-            # "01:00.1 Audio device [0403]: NVIDIA Corporation GP106 High Definition Audio [10de:10f1]"
-
-            # Extract class code
-            class_match = description.split("[")
-            device_class = "0000"
-            vendor_id = "0000"
-            device_id = "0000"
-            class_name = "Unknown"
-
-            if len(class_match) >= 2:
-                # Get class from first bracket pair
-                class_part = class_match[1].split("]")[0]
-                if len(class_part) == 4:
-                    device_class = class_part
-
-            # Get vendor:device from last bracket pair
-            if "[" in description:
-                last_bracket = description.rfind("[")
-                ids_part = description[last_bracket:].strip("[]")
-                if ":" in ids_part:
-                    vendor_id, device_id = ids_part.split(":")[:2]
-
-            # Get class name (between PCI address and [class])
-            parts = description.split(":", 1)
-            if len(parts) >= 2:
-                after_addr = parts[0].split(" ", 1)
-                if len(after_addr) >= 2:
-                    # Extract everything before the first [
-                    class_name_part = after_addr[1].split("[")[0].strip()
-                    class_name = class_name_part
-
-            return IOMMUDevice(
-                pci_address=pci_address,
-                device_class=device_class,
-                class_name=class_name,
-                vendor_id=vendor_id.lower(),
-                device_id=device_id.lower(),
-                description=description
-            )
+        Vendor, device and class come straight from the device's sysfs
+        attributes; the names are looked up in pci.ids, so no lspci
+        process is needed.
 
-        except subprocess.TimeoutExpired:
+        Args:
+            pci_address: PCI address of the device
+            bus_fd: Open fd of PCI_DEVICES_PATH, which saves resolving the
+                full path for every device
+        """
+        path = pci_address
+        if bus_fd is None:
+            path = os.path.join(self.PCI_DEVICES_PATH, pci_address)
+        try:
+            dir_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY, dir_fd=bus_fd)
+        except OSError:
             return None
-        except Exception as e:
-            print(f"Warning: Failed to get info for {pci_address}: {e}")
+
+        try:
+            # Values look like "0x10de" and "0x030000"
+            vendor_id = self._read_sysfs("vendor", dir_fd)[2:].lower()
+            device_id = self._read_sysfs("device", dir_fd)[2:].lower()
+            device_class = self._read_sysfs("class", dir_fd)[2:6].lower()
+        finally:
+            os.close(dir_fd)
+
+        if not (vendor_id and device_id and device_class):
             return None
 
+        class_name = _PCI_CLASS_NAMES.get(device_class, f"Class {device_class}")
+        vendor_name = self._db.vendor_name(vendor_id) or f"Unknown ({vendor_id})"
+        device_name = self._db.device_name(vendor_id, device_id) or f"Device {device_id}"
+
+        return IOMMUDevice(
+            pci_address=pci_address,
+            device_class=device_class,
+            class_name=class_name,
+            vendor_id=vendor_id,
+            device_id=device_id,
+            description=(
+                f"{pci_address} {class_name} [{device_class}]: "
+                f"{vendor_name} {device_name} [{vendor_id}:{device_id}]"
+            ),
+        )
+
+    @staticmethod
+    def _read_sysfs(name: str, dir_fd: int) -> str:
+        """Read a short sysfs attribute relative to dir_fd ("" on error)."""
+        try:
+            fd = os.open(name, os.O_RDONLY, dir_fd=dir_fd)
+        except OSError:
+            return ""
+        try:
+            return os.pread(fd, 4096, 0).decode("ascii", "replace").strip()
+        except OSError:
+            return ""
+        finally:
+            os.close(fd)
+
     def get_gpu_group(self, pci_address: str) -> Optional[IOMMUGroup]:
         """Get the IOMMU group containing a specific PCI device."""
         for group in self.groups.values():
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+NeuronOS Hardware Detection - PCI IDs Database
+
+Vendor and device names from the hwdata pci.ids file, shared by the GPU
+scanner and the IOMMU parser so the file is only parsed once per process.
+"""
+
+import functools
+import marshal
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+def _parse_id(value) -> Optional[int]:
+    """Parse a 4-digit hex PCI ID, or return None if it isn't one."""
+    if len(value) != 4:
+        return None
+    try:
+        return int(value, 16)
+    except ValueError:
+        return None
+
+
+class PciIdsDB:
+    """PCI vendor/device name lookups backed by pci.ids."""
+
+    PCI_IDS_PATH = Path("/usr/share/hwdata/pci.ids")
+    # Parsed pci.ids tables; None means $XDG_CACHE_HOME/neuron-os/pci_ids.marshal
+    CACHE_PATH: Optional[Path] = None
+
+    def __init__(self):
+        # IDs are stored as ints: vendors maps vendor -> name and devices
+        # maps (vendor, device) -> name. Starts with the fallback vendor
+        # names; pci.ids is loaded on the first lookup that misses.
+        self.vendors: Dict[int, str] = {
+            0x10de: "NVIDIA Corporation",
+            0x1002: "Advanced Micro Devices, Inc. [AMD/ATI]",
+            0x8086: "Intel Corporation",
+            0x1022: "Advanced Micro Devices, Inc. [AMD]",
+        }
+        self.devices: Dict[Tuple[int, int], str] = {}
+        self.loaded = False
+        # Scanners look names up from worker threads
+        self._load_lock = threading.Lock()
+
+    def vendor_name(self, vendor_id: str) -> Optional[str]:
+        """Look up a vendor name by its hex ID."""
+        key = _parse_id(vendor_id)
+        name = self.vendors.get(key)
+        if name is None and not self.loaded:
+            self.load()
+            name = self.vendors.get(key)
+        return name
+
+    def device_name(self, vendor_id: str, device_id: str) -> Optional[str]:
+        """Look up a device name by its hex vendor and device IDs."""
+        key = (_parse_id(vendor_id), _parse_id(device_id))
+        name = self.devices.get(key)
+        if name is None and not self.loaded:
+            self.load()
+            name = self.devices.get(key)
+        return name
+
+    def load(self) -> None:
+        """Load the full pci.ids database (once)."""
+        if self.loaded:
+            return
+        with self._load_lock:
+            if self.loaded:
+                return
+            # Try to load full database, from the parsed-table cache if it
+            # is still current. loaded is only set once the tables are
+            # complete, so other threads wait here instead of missing.
+            try:
+                if self.PCI_IDS_PATH.exists() and not self._load_compiled():
+                    self.parse(self.PCI_IDS_PATH)
+                    self._save_compiled()
+            except Exception:
+                pass  # Use fallback
+            finally:
+                self.loaded = True
+
+    def _compiled_path(self) -> Path:
+        if self.CACHE_PATH is not None:
+            return self.CACHE_PATH
+        cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        return Path(cache_home) / "neuron-os" / "pci_ids.marshal"
+
+    def _stamp(self) -> Tuple[int, int]:
+        """Identify the installed pci.ids version by size and mtime."""
+        st = os.stat(self.PCI_IDS_PATH)
+        return st.st_size, st.st_mtime_ns
+
+    def _load_compiled(self) -> bool:
+        """
+        Load tables saved by _save_compiled().
+
+        Returns:
+            True if the cache exists, is owned by us, is well formed and
+            matches the installed pci.ids
+        """
+        try:
+            with open(self._compiled_path(), 'rb') as f:
+                # marshal is not safe for untrusted data, and this may run
+                # as root: only trust a cache nobody else could have written
+                st = os.fstat(f.fileno())
+                if st.st_uid != os.geteuid() or st.st_mode & 0o022:
+                    return False
+                stamp, vendors, devices = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+
+        # A cache of the wrong shape is treated as stale, so it is rewritten
+        if not (isinstance(stamp, tuple) and len(stamp) == 2
+                and isinstance(vendors, dict) and isinstance(devices, dict)):
+            return False
+        if stamp != self._stamp():
+            return False
+
+        self.vendors.update(vendors)
+        self.devices.update(devices)
+        return True
+
+    def _save_compiled(self) -> None:
+        """Save the parsed tables so later runs can skip parsing pci.ids."""
+        path = self._compiled_path()
+        data = marshal.dumps((self._stamp(), self.vendors, self.devices))
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Read-only or missing home: parse again next time
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    def parse(self, path: Path) -> None:
+        """Parse pci.ids file for vendor/device names."""
+        vendors = self.vendors
+        devices = self.devices
+        current_vendor = None
+
+        # Read and split the raw bytes in one go, then dispatch on the first
+        # byte of each line; only the names that are kept get decoded.
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        for line in data.split(b'\n'):
+            first = line[:1]
+
+            # Device line (single tab)
+            if first == b'\t':
+                if current_vendor is None or line[1:2] == b'\t':
+                    continue
+                parts = line.split(None, 1)
+                if len(parts) >= 2:
+                    device_id = _parse_id(parts[0])
+                    if device_id is not None:
+                        devices[current_vendor, device_id] = (
+                            parts[1].strip().decode('utf-8', 'ignore')
+                        )
+
+            # Vendor line (no leading whitespace); skip comments and blanks
+            elif first not in (b'#', b' ', b''):
+                parts = line.split(None, 1)
+                current_vendor = _parse_id(parts[0]) if len(parts) >= 2 else None
+                if current_vendor is not None:
+                    vendors[current_vendor] = parts[1].strip().decode('utf-8', 'ignore')
+
+
+@functools.lru_cache(maxsize=1)
+def load() -> PciIdsDB:
+    """Get the process-wide PCI IDs database."""
+    return PciIdsDB()
@@ -7,7 +7,10 @@ Command-line interface for migrating files from Windows/macOS.
 
 import argparse
 import logging
+import os
 import sys
+import time
+from collections import defaultdict
 from pathlib import Path
 
 from .drive_detector import DriveDetector, DriveType
@@ -21,29 +24,47 @@ from .migrator import (
 
 logger = logging.getLogger(__name__)
 
+# Drive types that hold a migratable OS install
+_PRIMARY_TYPES = frozenset({DriveType.WINDOWS, DriveType.MACOS})
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+# The progress bar is redrawn at most this often (seconds); with many small
+# files a redraw and flush per file would slow the copy down
+_PROGRESS_INTERVAL = 1 / 30
+_last_progress_update = 0.0
+
+# Every possible progress bar, indexed by the number of filled cells
+_BAR_WIDTH = 40
+_BARS = tuple("=" * filled + "-" * (_BAR_WIDTH - filled) for filled in range(_BAR_WIDTH + 1))
+
 
 def format_size(bytes_val: int) -> str:
     """Format bytes as human-readable size."""
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if bytes_val < 1024:
-            return f"{bytes_val:.1f} {unit}"
-        bytes_val /= 1024
-    return f"{bytes_val:.1f} PB"
+    # Each unit is 10 more bits, so the unit follows from the bit length
+    idx = max(0, min((int(bytes_val).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1))
+    return f"{bytes_val / (1 << (idx * 10)):.1f} {_SIZE_UNITS[idx]}"
 
 
 def progress_callback(progress: MigrationProgress):
     """Display progress during migration."""
-    bar_width = 40
-    filled = int(bar_width * progress.percent / 100)
-    bar = "=" * filled + "-" * (bar_width - filled)
+    global _last_progress_update
+
+    percent = progress.percent
+    now = time.monotonic()
+    if percent < 100 and now - _last_progress_update < _PROGRESS_INTERVAL:
+        return
+    _last_progress_update = now
+
+    # Files can grow while being copied, so percent may pass 100
+    bar = _BARS[min(int(_BAR_WIDTH * percent / 100), _BAR_WIDTH)]
 
-    print(
-        f"\r[{bar}] {progress.percent:.1f}% "
+    sys.stdout.write(
+        f"\r[{bar}] {percent:.1f}% "
         f"({progress.files_done}/{progress.files_total}) "
-        f"{progress.current_file[:30]:30s}",
-        end="",
-        flush=True,
+        f"{progress.current_file[:30]:30s}"
     )
+    sys.stdout.flush()
 
 
 def cmd_scan(args):
@@ -53,10 +74,13 @@ def cmd_scan(args):
     detector = DriveDetector()
     drives = detector.scan()
 
-    # Group by type
-    windows_drives = [d for d in drives if d.drive_type == DriveType.WINDOWS]
-    macos_drives = [d for d in drives if d.drive_type == DriveType.MACOS]
-    other_drives = [d for d in drives if d.drive_type not in (DriveType.WINDOWS, DriveType.MACOS)]
+    # Group by type in one pass; None collects everything else
+    by_type = defaultdict(list)
+    for drive in drives:
+        by_type[drive.drive_type if drive.drive_type in _PRIMARY_TYPES else None].append(drive)
+    windows_drives = by_type[DriveType.WINDOWS]
+    macos_drives = by_type[DriveType.MACOS]
+    other_drives = by_type[None]
 
     if windows_drives:
         print("Windows Installations:")
@@ -102,12 +126,10 @@ def cmd_migrate(args):
     # Detect OS type
     os_type = args.type
     if not os_type:
-        detector = DriveDetector()
-        detector.scan()
-        # Try to detect from path
-        if (source_path / "AppData").exists():
+        # Detect from the user folder layout
+        if os.path.isdir(os.path.join(source_path, "AppData")):
             os_type = "windows"
-        elif (source_path / "Library").exists():
+        elif os.path.isdir(os.path.join(source_path, "Library")):
             os_type = "macos"
         else:
             print("Could not detect OS type. Use --type windows or --type macos")
@@ -9,14 +9,74 @@ from __future__ import annotations
 
 import logging
 import os
+import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 
 logger = logging.getLogger(__name__)
 
+# Drives are identified concurrently; the work is stat/readdir calls on
+# possibly slow or spun-down media, which release the GIL
+_IDENTIFY_MAX_WORKERS = 16
+
+# Account directories that are not real users
+_WINDOWS_SKIP_USERS = frozenset({"Default", "Default User", "Public", "All Users"})
+_MACOS_SKIP_USERS = frozenset({"Shared", ".localized", "Guest"})
+
+# lsblk size suffixes
+_SIZE_MULTIPLIERS = {
+    "K": 1024,
+    "M": 1024 ** 2,
+    "G": 1024 ** 3,
+    "T": 1024 ** 4,
+}
+
+# Octal escapes the kernel uses for spaces etc. in /proc/mounts paths
+_MOUNTS_ESCAPE_RE = re.compile(r"\\([0-7]{3})")
+# Hex escapes in udev's *_ENC properties
+_UDEV_ESCAPE_RE = re.compile(r"\\x([0-9a-fA-F]{2})")
+
+
+def _read_text(path) -> str:
+    """Read a small text file such as a sysfs attribute ("" on error)."""
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _subdirs(path) -> List[os.DirEntry]:
+    """Entries of directory path that are directories ([] if unreadable)."""
+    try:
+        with os.scandir(path) as it:
+            # is_dir() is answered from the readdir d_type where possible
+            return [entry for entry in it if entry.is_dir()]
+    except OSError:
+        return []
+
+
+def _top_level_names(path) -> Set[str]:
+    """Names of the entries directly under path (empty if unreadable)."""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name for entry in it}
+    except OSError:
+        return set()
+
+
+def _contains_any(path, names) -> bool:
+    """Check whether directory path has an entry named in names (one readdir)."""
+    try:
+        with os.scandir(path) as it:
+            return any(entry.name in names for entry in it)
+    except OSError:
+        return False
+
 
 class DriveType(Enum):
     """Type of detected drive."""
@@ -64,16 +124,20 @@ class DriveDetector:
     """
 
     # Known Windows user folders
-    WINDOWS_USER_FOLDERS = {
+    WINDOWS_USER_FOLDERS = frozenset({
         "Documents", "Downloads", "Pictures", "Music", "Videos", "Desktop",
         "AppData",
-    }
+    })
 
     # Known macOS user folders
-    MACOS_USER_FOLDERS = {
+    MACOS_USER_FOLDERS = frozenset({
         "Documents", "Downloads", "Pictures", "Music", "Movies", "Desktop",
         "Library", "Applications",
-    }
+    })
+
+    SYS_BLOCK_PATH = "/sys/class/block"
+    MOUNTS_PATH = "/proc/self/mounts"
+    UDEV_DATA_PATH = "/run/udev/data"
 
     def __init__(self):
         self._drives: List[DetectedDrive] = []
@@ -87,7 +151,94 @@ class DriveDetector:
         """
         self._drives = []
 
-        # Get list of block devices
+        # Mounted partitions come straight from sysfs and the mount table;
+        # lsblk (a subprocess plus a JSON round trip) is only the fallback
+        if not self._scan_sysfs():
+            self._scan_lsblk()
+
+        # Identify drive types. Each call only updates its own drive, so
+        # they can overlap and the scan waits for the slowest drive only.
+        mounted = [drive for drive in self._drives if drive.mount_point]
+        if len(mounted) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(_IDENTIFY_MAX_WORKERS, len(mounted)),
+                thread_name_prefix="neuronos-drive-identify",
+            ) as executor:
+                list(executor.map(self._identify_drive, mounted))
+        else:
+            for drive in mounted:
+                self._identify_drive(drive)
+
+        return self._drives
+
+    def _scan_sysfs(self) -> bool:
+        """
+        Find mounted partitions from /sys/class/block and the mount table.
+
+        Labels and filesystem types are taken from the udev database, as
+        lsblk does, falling back to the device name and mounted type.
+
+        Returns:
+            False if sysfs or the mount table is unavailable.
+        """
+        if not os.path.isdir(self.SYS_BLOCK_PATH):
+            return False
+        try:
+            with open(self.MOUNTS_PATH) as f:
+                mounts = f.read().splitlines()
+        except OSError:
+            return False
+
+        seen = set()
+        for line in mounts:
+            parts = line.split()
+            if len(parts) < 3 or not parts[0].startswith("/dev/"):
+                continue
+
+            # /dev/disk/by-*/ and /dev/mapper/ names are symlinks
+            name = os.path.basename(os.path.realpath(parts[0]))
+            block_dir = os.path.join(self.SYS_BLOCK_PATH, name)
+            # Only partitions, first mount of each
+            if name in seen or not os.path.exists(os.path.join(block_dir, "partition")):
+                continue
+            seen.add(name)
+
+            udev = self._read_udev_properties(_read_text(os.path.join(block_dir, "dev")))
+            label = udev.get("ID_FS_LABEL_ENC")
+            if label:
+                label = _UDEV_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)), label)
+            # size is in 512-byte sectors regardless of the device
+            sectors = _read_text(os.path.join(block_dir, "size"))
+
+            self._drives.append(DetectedDrive(
+                device=f"/dev/{name}",
+                mount_point=Path(_MOUNTS_ESCAPE_RE.sub(
+                    lambda m: chr(int(m.group(1), 8)), parts[1])),
+                label=label or udev.get("ID_FS_LABEL") or name,
+                filesystem=udev.get("ID_FS_TYPE") or parts[2],
+                size_bytes=int(sectors) * 512 if sectors.isdigit() else 0,
+                drive_type=DriveType.UNKNOWN,
+            ))
+
+        return True
+
+    def _read_udev_properties(self, dev: str) -> Dict[str, str]:
+        """Get the udev properties of the block device with major:minor dev."""
+        props = {}
+        if not dev:
+            return props
+        try:
+            with open(os.path.join(self.UDEV_DATA_PATH, f"b{dev}")) as f:
+                for line in f:
+                    if line.startswith("E:"):
+                        key, _, value = line[2:].rstrip("\n").partition("=")
+                        props[key] = value
+        except OSError:
+            pass
+        return props
+
+    def _scan_lsblk(self):
+        """Find mounted partitions with lsblk."""
         try:
             result = subprocess.run(
                 ["lsblk", "-J", "-o", "NAME,SIZE,TYPE,MOUNTPOINT,FSTYPE,LABEL"],
@@ -103,13 +254,6 @@ class DriveDetector:
             logger.warning(f"lsblk failed, falling back to /proc/mounts: {e}")
             self._parse_proc_mounts()
 
-        # Identify drive types
-        for drive in self._drives:
-            if drive.mount_point:
-                self._identify_drive(drive)
-
-        return self._drives
-
     def _parse_lsblk(self, data: dict):
         """Parse lsblk JSON output."""
         def process_device(device: dict, parent_name: str = ""):
@@ -176,22 +320,11 @@ class DriveDetector:
         if not size_str:
             return 0
 
-        multipliers = {
-            "K": 1024,
-            "M": 1024 ** 2,
-            "G": 1024 ** 3,
-            "T": 1024 ** 4,
-        }
-
         size_str = size_str.upper().strip()
-        for suffix, mult in multipliers.items():
-            if size_str.endswith(suffix):
-                try:
-                    return int(float(size_str[:-1]) * mult)
-                except ValueError:
-                    return 0
-
+        mult = _SIZE_MULTIPLIERS.get(size_str[-1:])
         try:
+            if mult:
+                return int(float(size_str[:-1]) * mult)
             return int(size_str)
         except ValueError:
             return 0
@@ -202,23 +335,25 @@ class DriveDetector:
             return
 
         mount = drive.mount_point
+        # One readdir of the drive root answers every layout check below
+        names = _top_level_names(mount)
 
         # Check for Windows installation
-        if self._is_windows_drive(mount):
+        if self._is_windows_drive(names):
             drive.drive_type = DriveType.WINDOWS
             drive.users = self._find_windows_users(mount)
-            drive.is_system_drive = (mount / "Windows" / "System32").exists()
+            drive.is_system_drive = os.path.isdir(os.path.join(mount, "Windows", "System32"))
             return
 
         # Check for macOS installation
-        if self._is_macos_drive(mount):
+        if self._is_macos_drive(names):
             drive.drive_type = DriveType.MACOS
             drive.users = self._find_macos_users(mount)
-            drive.is_system_drive = (mount / "System").exists()
+            drive.is_system_drive = "System" in names
             return
 
         # Check for Linux installation
-        if self._is_linux_drive(mount):
+        if self._is_linux_drive(names):
             drive.drive_type = DriveType.LINUX
             drive.users = self._find_linux_users(mount)
             return
@@ -226,66 +361,48 @@ class DriveDetector:
         # Default to data drive
         drive.drive_type = DriveType.DATA
 
-    def _is_windows_drive(self, mount: Path) -> bool:
-        """Check if mount point is a Windows installation."""
-        windows_dir = mount / "Windows"
-        users_dir = mount / "Users"
-        return windows_dir.exists() and users_dir.exists()
-
-    def _is_macos_drive(self, mount: Path) -> bool:
-        """Check if mount point is a macOS installation."""
-        users_dir = mount / "Users"
-        system_dir = mount / "System"
-        return users_dir.exists() and (
-            system_dir.exists() or
-            (mount / "Applications").exists()
-        )
-
-    def _is_linux_drive(self, mount: Path) -> bool:
-        """Check if mount point is a Linux installation."""
-        return (mount / "etc").exists() and (mount / "home").exists()
+    def _is_windows_drive(self, names: Set[str]) -> bool:
+        """Check if a drive root with these entries is a Windows installation."""
+        return "Windows" in names and "Users" in names
+
+    def _is_macos_drive(self, names: Set[str]) -> bool:
+        """Check if a drive root with these entries is a macOS installation."""
+        return "Users" in names and ("System" in names or "Applications" in names)
+
+    def _is_linux_drive(self, names: Set[str]) -> bool:
+        """Check if a drive root with these entries is a Linux installation."""
+        return "etc" in names and "home" in names
 
     def _find_windows_users(self, mount: Path) -> List[str]:
         """Find Windows user accounts."""
-        users_dir = mount / "Users"
         users = []
 
-        if users_dir.exists():
+        for entry in _subdirs(os.path.join(mount, "Users")):
             # Skip system accounts
-            skip = {"Default", "Default User", "Public", "All Users"}
-            for item in users_dir.iterdir():
-                if item.is_dir() and item.name not in skip:
-                    # Verify it's a real user (has typical folders)
-                    if any((item / folder).exists() for folder in self.WINDOWS_USER_FOLDERS):
-                        users.append(item.name)
+            if entry.name not in _WINDOWS_SKIP_USERS:
+                # Verify it's a real user (has typical folders)
+                if _contains_any(entry.path, self.WINDOWS_USER_FOLDERS):
+                    users.append(entry.name)
 
         return users
 
     def _find_macos_users(self, mount: Path) -> List[str]:
         """Find macOS user accounts."""
-        users_dir = mount / "Users"
         users = []
 
-        if users_dir.exists():
-            skip = {"Shared", ".localized", "Guest"}
-            for item in users_dir.iterdir():
-                if item.is_dir() and item.name not in skip and not item.name.startswith("."):
-                    if any((item / folder).exists() for folder in self.MACOS_USER_FOLDERS):
-                        users.append(item.name)
+        for entry in _subdirs(os.path.join(mount, "Users")):
+            if entry.name not in _MACOS_SKIP_USERS and not entry.name.startswith("."):
+                if _contains_any(entry.path, self.MACOS_USER_FOLDERS):
+                    users.append(entry.name)
 
         return users
 
     def _find_linux_users(self, mount: Path) -> List[str]:
         """Find Linux user accounts."""
-        home_dir = mount / "home"
-        users = []
-
-        if home_dir.exists():
-            for item in home_dir.iterdir():
-                if item.is_dir() and not item.name.startswith("."):
-                    users.append(item.name)
-
-        return users
+        return [
+            entry.name for entry in _subdirs(os.path.join(mount, "home"))
+            if not entry.name.startswith(".")
+        ]
 
     def get_windows_drives(self) -> List[DetectedDrive]:
         """Get only Windows drives."""
@@ -197,7 +197,7 @@ class TestPhase4Robustness:
         def mock_sleep(seconds):
             delays.append(seconds)
 
-        @retry(max_attempts=3, delay=1.0, backoff=2.0)
+        @retry(max_attempts=3, delay=1.0, backoff=2.0, jitter=False)
         def flaky_service():
             nonlocal count
             count += 1
@@ -242,12 +242,16 @@ class TestPhase4Robustness:
             return "Secret"
 
         with patch("os.geteuid", return_value=1000): # Non-root
+            require_root.invalidate()
             with pytest.raises(PermissionError, match="requires root privileges"):
                 root_only_task()
                 
         with patch("os.geteuid", return_value=0): # Root
+            require_root.invalidate()
             assert root_only_task() == "Secret"
 
+        require_root.invalidate()
+
 
 # =============================================================================
 # PHASE 5: OVERALL INTEGRATION
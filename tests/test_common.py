@@ -34,6 +34,18 @@ class TestExceptions:
         assert error.recoverable is False
         assert "details:" in str(error)
 
+    def test_neuron_error_str_reflects_updates(self):
+        """Test details and cause added after construction appear in str()."""
+        from common.exceptions import NeuronError
+
+        error = NeuronError("Operation failed", details={"step": 1})
+        assert "caused by" not in str(error)
+
+        error.details["vm"] = "win11"
+        error.cause = OSError("disk full")
+        assert "'vm': 'win11'" in str(error)
+        assert "caused by: disk full" in str(error)
+
     def test_neuron_error_to_dict(self):
         """Test JSON serialization."""
         from common.exceptions import NeuronError
@@ -45,6 +57,20 @@ class TestExceptions:
         assert d["message"] == "Test"
         assert d["details"]["key"] == 1
 
+    def test_details_always_mutable_and_unshared(self):
+        """Test details can be added to any error without leaking into others."""
+        from common.exceptions import NeuronError
+
+        first = NeuronError("first")
+        second = NeuronError("second", details={})
+        first.details["vm"] = "win11"
+        second.details["vm"] = "arch"
+
+        assert first.details == {"vm": "win11"}
+        assert second.details == {"vm": "arch"}
+        assert NeuronError("third").to_dict()["details"] == {}
+        assert "win11" in str(first)
+
     def test_vm_not_found_error(self):
         """Test VMNotFoundError specialization."""
         from common.exceptions import VMNotFoundError
@@ -54,6 +80,15 @@ class TestExceptions:
         assert error.code == "VM_NOT_FOUND"
         assert error.recoverable is False
 
+    def test_error_codes_default_per_class(self):
+        """Test codes come from the class, falling back to its name."""
+        from common.exceptions import NeuronError, VMError, VMStartError
+
+        assert VMError("boom").code == "VMError"
+        assert VMStartError("vm", "no memory").code == "VM_START_FAILED"
+        assert VMError("boom", code="CUSTOM").code == "CUSTOM"
+        assert NeuronError("boom").to_dict()["details"] == {}
+
     def test_iommu_error_contains_hints(self):
         """Test IOMMUError includes helpful hints."""
         from common.exceptions import IOMMUError
@@ -128,6 +163,40 @@ class TestDecorators:
         with pytest.raises(ConnectionError):
             always_fails()
 
+    def test_retry_jitter_stays_below_ceiling(self, monkeypatch):
+        """Test @retry sleeps within the capped backoff ceiling."""
+        from common import decorators
+
+        sleeps = []
+        monkeypatch.setattr(decorators.time, "sleep", sleeps.append)
+
+        @decorators.retry(max_attempts=4, delay=1.0, backoff=4.0, max_delay=5.0)
+        def always_fails():
+            raise ConnectionError("always fails")
+
+        with pytest.raises(ConnectionError):
+            always_fails()
+
+        assert len(sleeps) == 3
+        for slept, ceiling in zip(sleeps, (1.0, 4.0, 5.0)):
+            assert 0 <= slept <= ceiling
+
+    def test_retry_without_jitter_is_deterministic(self, monkeypatch):
+        """Test @retry(jitter=False) sleeps the exact capped backoff."""
+        from common import decorators
+
+        sleeps = []
+        monkeypatch.setattr(decorators.time, "sleep", sleeps.append)
+
+        @decorators.retry(max_attempts=4, delay=1.0, backoff=4.0, max_delay=5.0, jitter=False)
+        def always_fails():
+            raise ConnectionError("always fails")
+
+        with pytest.raises(ConnectionError):
+            always_fails()
+
+        assert sleeps == [1.0, 4.0, 5.0]
+
     def test_timed_decorator(self, caplog):
         """Test @timed logs execution time."""
         from common.decorators import timed
@@ -141,6 +210,24 @@ class TestDecorators:
             result = slow_func()
 
         assert result == "done"
+        assert "slow_func completed in" in caplog.text
+
+    def test_timed_skips_timing_when_debug_disabled(self, caplog, monkeypatch):
+        """Test @timed does not time calls when DEBUG is filtered."""
+        from common import decorators
+
+        @decorators.timed
+        def fast_func():
+            return "done"
+
+        def fail():
+            raise AssertionError("perf_counter should not be called")
+
+        monkeypatch.setattr(decorators.time, "perf_counter", fail)
+        with caplog.at_level(logging.INFO):
+            assert fast_func() == "done"
+
+        assert "completed in" not in caplog.text
 
 
 class TestLogging:
@@ -155,6 +242,217 @@ class TestLogging:
         root = logging.getLogger()
         assert len(root.handlers) >= 1
 
+    def test_setup_logging_writes_file_from_listener(self, tmp_path):
+        """Test queued records reach the log file with tracebacks intact."""
+        import json
+        from common import logging_config
+
+        logging_config.setup_logging(level=logging.DEBUG, log_dir=tmp_path, json_logs=True)
+        log = logging.getLogger("neuronos.test_listener")
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            log.exception("failed %s", "op")
+        logging_config._stop_listener()
+
+        lines = (tmp_path / "neuronos.log").read_text().splitlines()
+        record = json.loads(lines[-1])
+        assert record["message"] == "failed op"
+        assert "ValueError: bad value" in record["exception"]
+
+        logging.getLogger().handlers.clear()
+
+    def test_stop_listener_keeps_console_output(self, capsys):
+        """Test records logged after the listener stops still reach stderr."""
+        import logging.handlers
+        from common import logging_config
+
+        logging_config.setup_logging(level=logging.INFO)
+        assert logging._srcfile is None
+        logging_config._stop_listener()
+        assert logging._srcfile == logging_config._SRCFILE
+
+        root = logging.getLogger()
+        assert not any(
+            isinstance(h, logging.handlers.QueueHandler) for h in root.handlers
+        )
+        logging.getLogger("neuronos.test_after_stop").error("late failure")
+        assert "late failure" in capsys.readouterr().err
+
+        root.handlers.clear()
+
+    def test_json_file_handler_rotates(self, tmp_path):
+        """Test the JSON file handler batches writes and rotates by size."""
+        import json
+        from common.logging_config import JSONFormatter, _JSONFileHandler
+
+        path = tmp_path / "neuronos.log"
+        handler = _JSONFileHandler(path, maxBytes=400, backupCount=2)
+        handler.setFormatter(JSONFormatter())
+        for i in range(10):
+            handler.handle(logging.LogRecord(
+                "neuronos.test", logging.INFO, "test.py", 1, "message %d", (i,), None
+            ))
+        handler.close()
+
+        assert (tmp_path / "neuronos.log.1").exists()
+        assert (tmp_path / "neuronos.log.2").exists()
+        assert not (tmp_path / "neuronos.log.3").exists()
+        assert path.stat().st_size <= 400
+        last = json.loads(path.read_text().splitlines()[-1])
+        assert last["message"] == "message 9"
+
+    def test_json_file_handler_survives_failed_rollover(self, tmp_path, monkeypatch):
+        """Test a removed log or failed rename does not stop file logging."""
+        import os
+        from common import logging_config
+        from common.logging_config import JSONFormatter, _JSONFileHandler
+
+        def record(i):
+            return logging.LogRecord(
+                "neuronos.test", logging.INFO, "test.py", 1, "message %d", (i,), None
+            )
+
+        path = tmp_path / "neuronos.log"
+        handler = _JSONFileHandler(path, maxBytes=300, backupCount=2)
+        handler.setFormatter(JSONFormatter())
+        handler.handle(record(0))
+        handler.flush()
+        path.unlink()
+        for i in range(1, 4):
+            handler.handle(record(i))
+        handler.flush()
+        assert path.exists()
+
+        real_replace = os.replace
+
+        def failing_replace(src, dst):
+            if src == handler.baseFilename:
+                raise PermissionError(src)
+            return real_replace(src, dst)
+
+        monkeypatch.setattr(logging_config.os, "replace", failing_replace)
+        monkeypatch.setattr(logging, "raiseExceptions", False)
+        for i in range(4, 8):
+            handler.handle(record(i))
+        monkeypatch.undo()
+        handler.handle(record(8))
+        handler.close()
+
+        assert "message 8" in path.read_text()
+
+    def test_batch_file_handler_writes_once_per_flush(self, tmp_path):
+        """Test a flushed batch reaches the file in one write and still rotates."""
+        import io
+        from common.logging_config import _BatchRotatingFileHandler, _BatchingMemoryHandler
+
+        class CountingRaw(io.RawIOBase):
+            writes = 0
+
+            def writable(self):
+                return True
+
+            def write(self, b):
+                self.writes += 1
+                return len(b)
+
+        path = tmp_path / "neuronos.log"
+        handler = _BatchRotatingFileHandler(path, maxBytes=10 ** 6, backupCount=1,
+                                            encoding="utf-8")
+        handler.stream.close()
+        raw = CountingRaw()
+        handler.stream = io.TextIOWrapper(io.BufferedWriter(raw, 1 << 20), encoding="utf-8")
+        memory = _BatchingMemoryHandler(capacity=1000, target=handler)
+
+        for i in range(200):
+            memory.handle(logging.LogRecord(
+                "neuronos.test", logging.INFO, "test.py", 1, "message %d", (i,), None
+            ))
+        assert raw.writes == 0
+        memory.flush()
+        assert raw.writes == 1
+        handler.stream = None
+        handler.close()
+
+        handler = _BatchRotatingFileHandler(path, maxBytes=100, backupCount=1,
+                                            encoding="utf-8")
+        for i in range(10):
+            handler.handle(logging.LogRecord(
+                "neuronos.test", logging.INFO, "test.py", 1, "message %d", (i,), None
+            ))
+        handler.close()
+
+        assert (tmp_path / "neuronos.log.1").exists()
+        assert path.stat().st_size < 100
+        assert path.read_text().splitlines()[-1] == "message 9"
+
+    def test_json_formatter_output(self):
+        """Test JSONFormatter emits parseable records with a stable timestamp."""
+        import json
+        from common.logging_config import JSONFormatter
+
+        formatter = JSONFormatter()
+        record = logging.LogRecord(
+            "neuronos.test", logging.INFO, "test.py", 42, "hello %s", ("world",), None
+        )
+        data = json.loads(formatter.format(record))
+
+        assert data["message"] == "hello world"
+        assert data["level"] == "INFO"
+        assert data["line"] == 42
+        assert data["timestamp"] == logging.Formatter().formatTime(record)
+        assert "data" not in data
+
+    def test_colored_formatter_leaves_record_untouched(self):
+        """Test ColoredFormatter colors the level without mutating the record."""
+        from common.logging_config import ColoredFormatter
+
+        formatter = ColoredFormatter(ColoredFormatter.CONSOLE_FORMAT)
+        record = logging.LogRecord(
+            "neuronos.test", logging.WARNING, "test.py", 1, "careful", None, None
+        )
+        output = formatter.format(record)
+
+        assert output == "\033[33mWARNING\033[0m neuronos.test: careful"
+        assert record.levelname == "WARNING"
+
+    def test_log_context_nests_and_resets(self, caplog):
+        """Test LogContext merges nested fields and clears them on exit."""
+        from common.logging_config import LogContext
+
+        log = logging.getLogger("neuronos.test_context")
+        with caplog.at_level(logging.INFO):
+            with LogContext(vm_name="vm1"):
+                with LogContext(operation="start"):
+                    log.info("inner")
+                log.info("outer")
+            log.info("outside")
+
+        inner, outer, outside = caplog.records[-3:]
+        assert inner.extra_data == {"vm_name": "vm1", "operation": "start"}
+        assert outer.extra_data == {"vm_name": "vm1"}
+        assert not hasattr(outside, "extra_data")
+
+    def test_json_template_matches_json_dumps(self):
+        """Test the template path renders exactly what json.dumps would."""
+        import json
+        from common.logging_config import JSONFormatter
+
+        formatter = JSONFormatter()
+        try:
+            raise RuntimeError('quote " and \u00e9')
+        except RuntimeError:
+            import sys
+            exc_info = sys.exc_info()
+        record = logging.LogRecord(
+            "neuronos.test", logging.ERROR, "test.py", 7, "caf\u00e9 %s", ("\n",), exc_info
+        )
+        record.extra_data = {"vm": "win11", "cores": 4}
+
+        assert formatter._format_template(record) == json.dumps(
+            formatter._record_data(record)
+        )
+
     def test_get_logger_prefix(self):
         """Test get_logger adds neuronos prefix."""
         from common.logging_config import get_logger
@@ -233,6 +531,31 @@ class TestResources:
         with pool.acquire() as r2:
             assert r2["id"] == 1  # Same resource
 
+    def test_resource_pool_destroys_invalid_and_overflow(self):
+        """Test ResourcePool destroys invalid resources and those beyond max_size."""
+        from common.resources import ResourcePool
+
+        counter = iter(range(1, 100))
+        destroyed = []
+        pool = ResourcePool(
+            create=lambda: {"id": next(counter), "valid": True},
+            destroy=destroyed.append,
+            validate=lambda r: r["valid"],
+            max_size=1,
+        )
+
+        with pool.acquire() as r1:
+            with pool.acquire() as r2:
+                pass
+        assert destroyed == [r1]  # pool already held r2
+        assert pool.size == 1
+        assert pool.total_created == 1
+
+        r2["valid"] = False
+        with pool.acquire() as r3:
+            assert r3["id"] == 3
+        assert destroyed == [r1, r2]
+
     def test_cleanup_registry(self):
         """Test CleanupRegistry executes callbacks."""
         from common.resources import CleanupRegistry
@@ -248,6 +571,83 @@ class TestResources:
         # Should be called in reverse order
         assert cleanup_called == [2, 1]
 
+    def test_cleanup_registry_parallel(self):
+        """Test parallel cleanup runs every callback and survives failures."""
+        import threading
+        from common.resources import CleanupRegistry
+
+        called = []
+        lock = threading.Lock()
+        registry = CleanupRegistry()
+
+        for i in range(10):
+            def callback(i=i):
+                if i == 3:
+                    raise OSError("close failed")
+                with lock:
+                    called.append(i)
+            registry.register(callback)
+
+        registry.cleanup_all(parallel=True)
+
+        assert sorted(called) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+
+    def test_cleanup_registry_unregisters_bound_method(self):
+        """Test unregister matches an equal bound method."""
+        from common.resources import CleanupRegistry
+
+        class Conn:
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        conn = Conn()
+        registry = CleanupRegistry()
+        registry.register(conn.close)
+        registry.unregister(conn.close)
+        registry.cleanup_all()
+
+        assert conn.closed is False
+
+
+    def test_cleanup_registry_duplicates_and_unhashable(self):
+        """Test repeated and unhashable callbacks keep list semantics."""
+        from dataclasses import dataclass
+        from common.resources import CleanupRegistry
+
+        @dataclass
+        class Conn:
+            closes: int = 0
+
+            def close(self):
+                self.closes += 1
+
+        calls = []
+
+        def callback():
+            calls.append(1)
+
+        conn = Conn()
+        registry = CleanupRegistry()
+        registry.register(callback)
+        registry.register(callback)
+        registry.register(conn.close)
+        registry.cleanup_all()
+
+        assert calls == [1, 1]
+        assert conn.closes == 1
+
+        registry.register(callback)
+        registry.register(callback)
+        registry.register(conn.close)
+        registry.unregister(callback)
+        registry.unregister(conn.close)
+        registry.cleanup_all()
+
+        assert calls == [1, 1, 1]
+        assert conn.closes == 1
+
 
 class TestSingletons:
     """Tests for thread-safe singletons."""
@@ -282,6 +682,28 @@ class TestSingletons:
         counter.decrement(3)
         assert counter.value == 3
 
+    def test_read_write_lock_writer_waits_for_readers(self):
+        """Test a writer blocks until the last reader leaves."""
+        import threading
+        from common.singleton import ReadWriteLock
+
+        lock = ReadWriteLock()
+        events = []
+
+        def writer():
+            with lock.write():
+                events.append("write")
+
+        with lock.read():
+            with lock.read():
+                thread = threading.Thread(target=writer)
+                thread.start()
+                time.sleep(0.05)
+                events.append("read")
+
+        thread.join(timeout=2)
+        assert events == ["read", "write"]
+
 
 class TestFeatures:
     """Tests for graceful degradation."""
@@ -330,3 +752,74 @@ class TestFeatures:
 
         with pytest.raises(RuntimeError):
             manager.execute("test_feature")
+
+    def test_clear_cache_resets_memoized_check(self):
+        """Test clear_cache re-runs memoized host probes."""
+        import functools
+        from common.features import Feature, FeatureManager
+
+        calls = []
+
+        @functools.cache
+        def probe():
+            calls.append(1)
+            return True
+
+        manager = FeatureManager()
+        manager.register(Feature(name="probe", check=probe, primary=lambda: "ok"))
+
+        assert manager.is_available("probe")
+        assert manager.is_available("probe")
+        assert len(calls) == 1
+
+        manager.clear_cache("probe")
+        assert manager.is_available("probe")
+        assert len(calls) == 2
+
+    def test_resolve_is_cached_until_cache_cleared(self):
+        """Test resolve() caches the chosen implementation."""
+        from common.features import Feature, FeatureManager
+
+        state = {"available": True}
+        manager = FeatureManager()
+        manager.register(Feature(
+            name="test_feature",
+            check=lambda: state["available"],
+            primary=lambda: "primary",
+            fallback=lambda: "fallback",
+        ))
+
+        assert manager.execute("test_feature") == "primary"
+        state["available"] = False
+        assert manager.execute("test_feature") == "primary"
+
+        manager.clear_cache("test_feature")
+        assert manager.resolve("test_feature")() == "fallback"
+
+    def test_execute_unregistered_raises_key_error(self):
+        """Test execute() raises KeyError for unknown features."""
+        from common.features import FeatureManager
+
+        with pytest.raises(KeyError):
+            FeatureManager().execute("missing")
+
+    def test_sealed_manager_executes_by_index(self):
+        """Test seal() enables index dispatch and blocks registration."""
+        from common.features import Feature, FeatureManager
+
+        manager = FeatureManager()
+        manager.register_features([
+            Feature(name="double", check=lambda: True, primary=lambda x: x * 2),
+            Feature(name="inc", check=lambda: False, primary=lambda x: x,
+                    fallback=lambda x: x + 1),
+        ])
+        manager.seal()
+
+        assert manager.execute_by_index(manager.index_of("double"), 5) == 10
+        assert manager.execute_by_index(manager.index_of("inc"), 5) == 6
+        assert manager.execute("inc", 1) == 2
+
+        with pytest.raises(KeyError):
+            manager.index_of("missing")
+        with pytest.raises(RuntimeError):
+            manager.register(Feature(name="late", check=lambda: True, primary=print))
@@ -13,7 +13,9 @@ import json
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from hardware_detect import gpu_scanner
 from hardware_detect.gpu_scanner import GPUScanner, GPUDevice
+from hardware_detect.pci_ids_db import PciIdsDB
 
 
 class TestGPUDevice:
@@ -82,10 +84,17 @@ class TestGPUScanner:
         scanner = GPUScanner()
 
         # Should have at least these common vendors
-        vendors = scanner._pci_ids_cache.get("vendors", {})
-        assert "10de" in vendors  # NVIDIA
-        assert "1002" in vendors  # AMD
-        assert "8086" in vendors  # Intel
+        vendors = scanner._db.vendors
+        assert 0x10de in vendors  # NVIDIA
+        assert 0x1002 in vendors  # AMD
+        assert 0x8086 in vendors  # Intel
+
+    def test_pci_ids_db_is_shared(self):
+        """Test the scanner and the IOMMU parser use one PCI IDs database."""
+        from hardware_detect.iommu_parser import IOMMUParser
+
+        assert GPUScanner()._db is GPUScanner()._db
+        assert GPUScanner()._db is IOMMUParser()._db
 
     def test_get_passthrough_candidate_prefers_non_boot(self):
         """Test that non-boot VGA GPU is preferred for passthrough."""
@@ -118,6 +127,27 @@ class TestGPUScanner:
         assert candidate.pci_address == "0000:01:00.0"
         assert candidate.vendor_id == "10de"
 
+    def test_gpu_selection_follows_devices(self):
+        """Test the memoized GPU selection is redone when devices is replaced."""
+        scanner = GPUScanner()
+        dgpu = GPUDevice(
+            pci_address="0000:01:00.0",
+            vendor_id="10de",
+            device_id="1c03",
+            vendor_name="NVIDIA",
+            device_name="GTX 1060",
+            is_boot_vga=True,
+        )
+        scanner.devices = [dgpu]
+
+        # Single-GPU passthrough: the boot GPU is the only candidate
+        assert scanner.get_boot_gpu() is dgpu
+        assert scanner.get_passthrough_candidate() is dgpu
+
+        scanner.devices = []
+        assert scanner.get_boot_gpu() is None
+        assert scanner.get_passthrough_candidate() is None
+
     def test_get_boot_gpu(self):
         """Test getting the boot GPU."""
         scanner = GPUScanner()
@@ -168,6 +198,9 @@ class TestGPUScanner:
         assert parsed[0]["pci_address"] == "0000:01:00.0"
         assert parsed[0]["vendor_id"] == "10de"
 
+        from dataclasses import asdict
+        assert parsed[0] == asdict(scanner.devices[0])
+
     def test_no_passthrough_candidate_when_all_boot_vga(self):
         """Test that None is returned when all GPUs are boot VGA."""
         scanner = GPUScanner()
@@ -191,6 +224,255 @@ class TestGPUScanner:
         assert candidate is None
 
 
+def make_pci_device(root, address, vendor, device, pci_class,
+                    boot_vga=None, driver=None, iommu_group=None):
+    """Create a fake /sys/bus/pci/devices/<address> directory."""
+    path = root / address
+    path.mkdir(parents=True)
+    (path / "vendor").write_text(f"0x{vendor}\n")
+    (path / "device").write_text(f"0x{device}\n")
+    (path / "class").write_text(f"0x{pci_class}\n")
+    (path / "subsystem_vendor").write_text(f"0x{vendor}\n")
+    (path / "subsystem_device").write_text("0x0001\n")
+    if boot_vga is not None:
+        (path / "boot_vga").write_text(f"{int(boot_vga)}\n")
+    if driver is not None:
+        target = root.parent / "drivers" / driver
+        target.mkdir(parents=True, exist_ok=True)
+        (path / "driver").symlink_to(target)
+    if iommu_group is not None:
+        target = root.parent / "iommu_groups" / str(iommu_group)
+        target.mkdir(parents=True, exist_ok=True)
+        (path / "iommu_group").symlink_to(target)
+    return path
+
+
+class TestPciIdsDB:
+    """Tests for the shared pci.ids database."""
+
+    def test_parse_pci_ids(self, tmp_path):
+        """Test pci.ids vendor and device lines are parsed to int keys."""
+        pci_ids = tmp_path / "pci.ids"
+        pci_ids.write_text(
+            "# comment\n"
+            "10de  NVIDIA Corporation\n"
+            "\t2484  GA104 [GeForce RTX 3070]\n"
+            "\t\t1043 87b8  subsystem\n"
+            "1af4  Red Hat, Inc.\n"
+            "\t1041  Virtio network device\n"
+            "1b36  Red Hat, Inc. — QEMU\n"
+            "C 03  Display controller\n"
+            "\t00  VGA compatible controller\n",
+            encoding="utf-8",
+        )
+
+        db = PciIdsDB()
+        db.parse(pci_ids)
+        db.loaded = True
+
+        assert db.vendor_name("1AF4") == "Red Hat, Inc."
+        assert db.device_name("10de", "2484") == "GA104 [GeForce RTX 3070]"
+        assert db.device_name("1af4", "1041") == "Virtio network device"
+        assert db.vendor_name("1b36") == "Red Hat, Inc. — QEMU"
+        assert db.vendor_name("abcd") is None
+        assert 0xC not in db.vendors
+
+    def test_pci_ids_loaded_on_first_miss(self, tmp_path, monkeypatch):
+        """Test pci.ids is only read once a lookup misses the fallback table."""
+        pci_ids = tmp_path / "pci.ids"
+        pci_ids.write_text("1af4  Red Hat, Inc.\n\t1041  Virtio network device\n")
+        monkeypatch.setattr(PciIdsDB, "PCI_IDS_PATH", pci_ids)
+        monkeypatch.setattr(PciIdsDB, "CACHE_PATH", tmp_path / "pci_ids.marshal")
+
+        db = PciIdsDB()
+        assert db.vendor_name("10de") == "NVIDIA Corporation"
+        assert db.loaded is False
+
+        assert db.device_name("1af4", "1041") == "Virtio network device"
+        assert db.loaded is True
+
+    def test_compiled_pci_ids_cache(self, tmp_path, monkeypatch):
+        """Test parsed pci.ids tables are cached until pci.ids changes."""
+        from unittest.mock import patch
+
+        pci_ids = tmp_path / "pci.ids"
+        pci_ids.write_text("10de  NVIDIA Corporation\n\t2484  GA104\n")
+        monkeypatch.setattr(PciIdsDB, "PCI_IDS_PATH", pci_ids)
+        monkeypatch.setattr(PciIdsDB, "CACHE_PATH", tmp_path / "cache" / "pci_ids.marshal")
+
+        assert PciIdsDB().device_name("10de", "2484") == "GA104"
+        assert (tmp_path / "cache" / "pci_ids.marshal").exists()
+
+        with patch.object(PciIdsDB, "parse") as parse:
+            assert PciIdsDB().device_name("10de", "2484") == "GA104"
+            parse.assert_not_called()
+
+        pci_ids.write_text("10de  NVIDIA Corporation\n\t2484  GA104 [GeForce RTX 3070]\n")
+        assert PciIdsDB().device_name("10de", "2484") == "GA104 [GeForce RTX 3070]"
+
+    def test_compiled_pci_ids_cache_rejected(self, tmp_path, monkeypatch):
+        """Test malformed or foreign-writable caches are reparsed and rewritten."""
+        import marshal
+
+        pci_ids = tmp_path / "pci.ids"
+        pci_ids.write_text("10de  NVIDIA Corporation\n\t2484  GA104\n")
+        cache = tmp_path / "pci_ids.marshal"
+        monkeypatch.setattr(PciIdsDB, "PCI_IDS_PATH", pci_ids)
+        monkeypatch.setattr(PciIdsDB, "CACHE_PATH", cache)
+
+        cache.write_bytes(marshal.dumps((1, {}, {})))
+        assert PciIdsDB().device_name("10de", "2484") == "GA104"
+        stamp, _, devices = marshal.loads(cache.read_bytes())
+        assert isinstance(stamp, tuple) and devices[0x10de, 0x2484] == "GA104"
+
+        st = pci_ids.stat()
+        cache.write_bytes(marshal.dumps(((st.st_size, st.st_mtime_ns), {}, {(0x10de, 0x2484): "Planted"})))
+        cache.chmod(0o666)
+        assert PciIdsDB().device_name("10de", "2484") == "GA104"
+
+
+class TestGPUScannerSysfs:
+    """Tests for scanning a fake sysfs PCI tree."""
+
+    @pytest.fixture
+    def pci_root(self, tmp_path):
+        root = tmp_path / "devices"
+        make_pci_device(root, "0000:00:00.0", "8086", "3e30", "060000")
+        make_pci_device(root, "0000:00:02.0", "8086", "3e92", "030000",
+                        boot_vga=True, driver="i915", iommu_group=0)
+        make_pci_device(root, "0000:01:00.0", "10de", "2484", "030000",
+                        boot_vga=False, driver="nvidia", iommu_group=12)
+        make_pci_device(root, "0000:01:00.1", "10de", "228b", "040300",
+                        driver="snd_hda_intel", iommu_group=12)
+        return root
+
+    def test_scan_finds_display_devices(self, pci_root, monkeypatch):
+        """Test only display-class devices are returned, boot VGA first."""
+        monkeypatch.setattr(GPUScanner, "PCI_DEVICE_PATH", pci_root)
+        scanner = GPUScanner()
+
+        gpus = scanner.scan()
+
+        assert [g.pci_address for g in gpus] == ["0000:00:02.0", "0000:01:00.0"]
+        igpu, dgpu = gpus
+        assert igpu.is_boot_vga is True
+        assert igpu.driver_in_use == "i915"
+        assert igpu.iommu_group == 0
+        assert dgpu.is_boot_vga is False
+        assert dgpu.vendor_id == "10de"
+        assert dgpu.device_id == "2484"
+        assert dgpu.device_class == "0300"
+        assert dgpu.subsystem_device == "0001"
+        assert dgpu.iommu_group == 12
+        assert dgpu.driver_in_use == "nvidia"
+        assert dgpu.vendor_name == "NVIDIA Corporation"
+        assert scanner.get_passthrough_candidate() is dgpu
+
+    def test_scan_missing_sysfs(self, tmp_path, monkeypatch):
+        """Test scanning without a PCI sysfs tree returns no devices."""
+        monkeypatch.setattr(GPUScanner, "PCI_DEVICE_PATH", tmp_path / "missing")
+        assert GPUScanner().scan() == []
+
+    def test_boot_vga_not_read_after_found(self, pci_root, monkeypatch):
+        """Test boot_vga is only read until the boot GPU has been seen."""
+        import os
+
+        scanner = GPUScanner()
+        read_sysfs = scanner._read_sysfs
+        reads = []
+
+        def counting_read(path, dir_fd=None):
+            reads.append(path)
+            return read_sysfs(path, dir_fd)
+
+        monkeypatch.setattr(scanner, "_read_sysfs", counting_read)
+
+        for address, expected in (("0000:00:02.0", True), ("0000:01:00.0", False)):
+            dir_fd = os.open(pci_root / address, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                assert scanner._read_boot_vga(dir_fd) is expected
+            finally:
+                os.close(dir_fd)
+
+        assert reads.count(b"boot_vga") == 1
+
+    def test_scan_udev(self, pci_root, monkeypatch):
+        """Test GPUs are built from udev properties when pyudev is present."""
+        class FakeDevice(dict):
+            def __init__(self, path, props):
+                super().__init__(props)
+                self.sys_path = str(path)
+                self.sys_name = path.name
+
+        udev_devices = [
+            FakeDevice(pci_root / "0000:00:00.0",
+                       {"PCI_CLASS": "60000", "PCI_ID": "8086:3E30"}),
+            FakeDevice(pci_root / "0000:01:00.0",
+                       {"PCI_CLASS": "30000", "PCI_ID": "10DE:2484",
+                        "PCI_SUBSYS_ID": "10DE:0001", "DRIVER": "nvidia"}),
+            FakeDevice(pci_root / "0000:01:00.1",
+                       {"PCI_CLASS": "40300", "PCI_ID": "10DE:228B"}),
+        ]
+
+        class FakeContext:
+            def list_devices(self, subsystem):
+                assert subsystem == "pci"
+                return udev_devices
+
+        class FakePyudev:
+            Context = FakeContext
+
+        monkeypatch.setattr(gpu_scanner, "PYUDEV_AVAILABLE", True)
+        monkeypatch.setattr(gpu_scanner, "pyudev", FakePyudev, raising=False)
+
+        gpus = GPUScanner().scan()
+
+        assert len(gpus) == 1
+        dgpu = gpus[0]
+        assert dgpu.pci_address == "0000:01:00.0"
+        assert dgpu.vfio_ids == "10de:2484"
+        assert dgpu.subsystem_vendor == "10de"
+        assert dgpu.device_class == "0300"
+        assert dgpu.driver_in_use == "nvidia"
+        assert dgpu.iommu_group == 12
+        assert dgpu.is_boot_vga is False
+
+
+    def test_scan_sysfs_when_path_overridden(self, pci_root, monkeypatch):
+        """Test an overridden PCI_DEVICE_PATH is walked even with pyudev."""
+        class FailingPyudev:
+            def Context(self):
+                raise AssertionError("udev must not be used")
+
+        monkeypatch.setattr(gpu_scanner, "PYUDEV_AVAILABLE", True)
+        monkeypatch.setattr(gpu_scanner, "pyudev", FailingPyudev(), raising=False)
+        monkeypatch.setattr(GPUScanner, "PCI_DEVICE_PATH", pci_root)
+
+        gpus = GPUScanner().scan()
+        assert [g.pci_address for g in gpus] == ["0000:00:02.0", "0000:01:00.0"]
+
+    def test_scan_falls_back_when_udev_fails(self, monkeypatch, capsys):
+        """Test the sysfs walk is used when libudev cannot be loaded."""
+        class BrokenPyudev:
+            def Context(self):
+                raise ImportError("libudev.so.1: cannot open shared object file")
+
+        monkeypatch.setattr(gpu_scanner, "PYUDEV_AVAILABLE", True)
+        monkeypatch.setattr(gpu_scanner, "pyudev", BrokenPyudev(), raising=False)
+
+        scanner = GPUScanner()
+        gpu = GPUDevice(
+            pci_address="0000:01:00.0", vendor_id="10de", device_id="2484",
+            vendor_name="NVIDIA Corporation", device_name="GA104",
+            device_class="0300", subsystem_vendor="", subsystem_device="",
+            is_boot_vga=False, iommu_group=12, driver_in_use="nvidia",
+        )
+        monkeypatch.setattr(scanner, "_scan_sysfs", lambda: [gpu])
+
+        assert scanner.scan() == [gpu]
+        assert "udev enumeration failed" in capsys.readouterr().out
+
+
 class TestGPUScannerOnRealHardware:
     """
     Tests that run on real hardware.
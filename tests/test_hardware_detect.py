@@ -103,6 +103,62 @@ class TestIOMMUParser:
         assert len(group.devices) == 1
         assert group.devices[0].pci_address == "01:00.0"
 
+    @patch("subprocess.run")
+    def test_parse_all_reads_sysfs(self, mock_run, tmp_path):
+        """Test that parse_all builds devices from sysfs without lspci."""
+        from hardware_detect.iommu_parser import IOMMUParser
+
+        iommu_path = tmp_path / "iommu_groups"
+        pci_path = tmp_path / "pci_devices"
+        for group_id, address, vendor, device, pci_class in (
+            (0, "0000:00:02.0", "0x8086", "0x3e92", "0x030000"),
+            (1, "0000:01:00.0", "0x10de", "0x2484", "0x030000"),
+            (1, "0000:01:00.1", "0x10de", "0x228b", "0x040300"),
+        ):
+            devices = iommu_path / str(group_id) / "devices"
+            devices.mkdir(parents=True, exist_ok=True)
+            (devices / address).touch()
+            sysfs = pci_path / address
+            sysfs.mkdir(parents=True)
+            (sysfs / "vendor").write_text(vendor + "\n")
+            (sysfs / "device").write_text(device + "\n")
+            (sysfs / "class").write_text(pci_class + "\n")
+
+        with patch.object(IOMMUParser, "IOMMU_PATH", iommu_path), \
+                patch.object(IOMMUParser, "PCI_DEVICES_PATH", pci_path):
+            groups = IOMMUParser().parse_all()
+
+        mock_run.assert_not_called()
+
+        gpu = next(d for d in groups[1].devices if d.pci_address == "0000:01:00.0")
+        assert gpu.device_class == "0300"
+        assert gpu.class_name == "VGA compatible controller"
+        assert gpu.vfio_ids == "10de:2484"
+        assert gpu.description.startswith(
+            "0000:01:00.0 VGA compatible controller [0300]: NVIDIA")
+        assert gpu.description.endswith("[10de:2484]")
+        assert groups[1].is_clean
+        assert groups[0].devices[0].vendor_id == "8086"
+
+    def test_parse_all_sorts_groups_numerically(self, tmp_path):
+        """Test groups come back in numeric order, skipping non-group entries."""
+        from hardware_detect.iommu_parser import IOMMUParser
+
+        for name in ("10", "2", "1"):
+            (tmp_path / name / "devices").mkdir(parents=True)
+        (tmp_path / "README").touch()
+
+        parser = IOMMUParser()
+        with patch.object(IOMMUParser, "IOMMU_PATH", tmp_path):
+            groups = parser.parse_all()
+
+        assert parser.is_iommu_enabled
+        assert list(groups) == [1, 2, 10]
+
+        with patch.object(IOMMUParser, "IOMMU_PATH", tmp_path / "missing"):
+            assert parser.parse_all() == {}
+        assert not parser.is_iommu_enabled
+
 
 class TestCPUDetector:
     """Tests for CPUDetector class."""
@@ -145,6 +201,136 @@ model name	: AMD Ryzen 9 5900X 12-Core Processor
         assert detector is not None
 
 
+    def test_parse_cpuinfo(self, tmp_path):
+        """Test that cpuinfo parsing counts processors and reads the first core."""
+        from hardware_detect.cpu_detect import CPUDetector
+
+        cpuinfo = tmp_path / "cpuinfo"
+        cpuinfo.write_text(
+            "processor\t: 0\n"
+            "vendor_id\t: GenuineIntel\n"
+            "model name\t: Intel(R) Core(TM) i7-9700K CPU @ 3.60GHz\n"
+            "siblings\t: 8\n"
+            "cpu cores\t: 8\n"
+            "flags\t\t: fpu vme vmx sse\n"
+            "\n"
+            "processor\t: 1\n"
+            "vendor_id\t: GenuineIntel\n"
+            "model name\t: something else\n"
+            "\n"
+        )
+
+        with patch.object(CPUDetector, "CPUINFO_PATH", cpuinfo):
+            result = CPUDetector()._parse_cpuinfo()
+
+        assert result["_processor_count"] == 2
+        assert result["vendor_id"] == "GenuineIntel"
+        assert result["model name"] == "Intel(R) Core(TM) i7-9700K CPU @ 3.60GHz"
+        assert result["cpu cores"] == "8"
+        assert result["flags"] == "fpu vme vmx sse"
+
+
+    def test_detect_virtualization_flag(self):
+        """Test vmx/svm are matched as whole flags only."""
+        from hardware_detect.cpu_detect import CPUDetector
+
+        detector = CPUDetector()
+        with patch.object(detector, "_check_iommu_enabled", return_value=False):
+            for flags, expected in (
+                ("fpu vmx sse", True),
+                ("svm", True),
+                ("fpu vmxx avx512_svm", False),
+                ("", False),
+            ):
+                cpuinfo = {"_processor_count": 1, "flags": flags}
+                detector.invalidate()
+                with patch.object(detector, "_parse_cpuinfo", return_value=cpuinfo):
+                    assert detector.detect().has_virtualization is expected
+
+    def test_detect_is_cached(self):
+        """Test detect() parses once until invalidate() is called."""
+        from hardware_detect.cpu_detect import CPUDetector
+
+        detector = CPUDetector()
+        cpuinfo = {"_processor_count": 1, "vendor_id": "AuthenticAMD"}
+        with patch.object(detector, "_parse_cpuinfo", return_value=cpuinfo) as parse, \
+                patch.object(detector, "_check_iommu_enabled", return_value=True):
+            first = detector.detect()
+            assert detector.detect() is first
+            detector.check_bios_settings()
+            assert parse.call_count == 1
+
+            detector.invalidate()
+            assert detector.detect() is not first
+            assert parse.call_count == 2
+
+    def test_print_summary(self, capsys):
+        """Test the summary is printed in full, ending with a newline."""
+        from hardware_detect.cpu_detect import CPUDetector, CPUInfo
+
+        detector = CPUDetector()
+        cpu = CPUInfo("AMD", "AMD Ryzen 9 5900X", 12, 24, True, True, False,
+                      "amd_iommu=on iommu=pt")
+        with patch.object(detector, "detect", return_value=cpu):
+            detector.print_summary()
+
+        out = capsys.readouterr().out
+        assert out.startswith("=== CPU Detection ===\n\nVendor: AMD\n")
+        assert "    amd_iommu=on iommu=pt\n" in out
+        assert out.endswith("For systemd-boot, edit /boot/loader/entries/*.conf\n")
+
+    @patch("subprocess.run")
+    def test_iommu_check_prefers_sysfs(self, mock_run, tmp_path):
+        """Test that IOMMU groups in sysfs are checked before dmesg."""
+        from hardware_detect.cpu_detect import CPUDetector
+
+        groups = tmp_path / "iommu_groups"
+        groups.mkdir()
+        cmdline = tmp_path / "cmdline"
+        cmdline.write_text("root=/dev/sda intel_iommu=on\n")
+        detector = CPUDetector()
+
+        with patch.object(CPUDetector, "CMDLINE_PATH", cmdline), \
+                patch.object(CPUDetector, "IOMMU_GROUPS_PATH", groups):
+            assert detector._check_iommu_enabled() is False
+            (groups / "0").mkdir()
+            assert detector._check_iommu_enabled() is True
+
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_iommu_check_falls_back_to_kernel_log(self, mock_run, tmp_path):
+        """Test that the kernel log is read when sysfs has no IOMMU groups."""
+        from hardware_detect.cpu_detect import CPUDetector
+
+        dmesg = tmp_path / "dmesg"
+        dmesg.write_bytes(b"[    0.1] DMAR: IOMMU enabled\n")
+        cmdline = tmp_path / "cmdline"
+        cmdline.write_text("intel_iommu=on\n")
+        detector = CPUDetector()
+
+        with patch.object(CPUDetector, "CMDLINE_PATH", cmdline), \
+                patch.object(CPUDetector, "IOMMU_GROUPS_PATH", tmp_path / "missing"), \
+                patch.object(CPUDetector, "DMESG_PATH", dmesg):
+            assert detector._check_iommu_enabled() is True
+
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_iommu_check_runs_dmesg_last(self, mock_run, tmp_path):
+        """Test that dmesg is only spawned when no kernel log can be read."""
+        from hardware_detect.cpu_detect import CPUDetector
+
+        mock_run.return_value = MagicMock(stdout=b"AMD-Vi: Interrupt remapping enabled\n")
+        detector = CPUDetector()
+
+        with patch.object(CPUDetector, "DMESG_PATH", tmp_path / "missing"), \
+                patch.object(CPUDetector, "KMSG_PATH", str(tmp_path / "kmsg")):
+            assert detector._verify_iommu_dmesg() is True
+
+        mock_run.assert_called_once()
+
+
 class TestConfigGenerator:
     """Tests for ConfigGenerator class."""
 
@@ -196,6 +382,275 @@ class TestConfigGenerator:
         bootloader = generator.detect_bootloader(tmp_path)
         assert bootloader == "grub"
 
+    def test_detect_bootloader_efi(self, tmp_path):
+        """Test bootloader detection from the EFI directory."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        generator = ConfigGenerator()
+        assert generator._detect_bootloader(tmp_path) == "unknown"
+
+        (tmp_path / "boot/EFI/grub").mkdir(parents=True)
+        assert generator._detect_bootloader(tmp_path) == "grub"
+
+        (tmp_path / "boot/EFI/systemd").mkdir()
+        assert generator._detect_bootloader(tmp_path) == "systemd-boot"
+
+    def test_update_mkinitcpio_and_grub(self, tmp_path):
+        """Test MODULES and GRUB_CMDLINE_LINUX_DEFAULT rewriting."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        (tmp_path / "etc/default").mkdir(parents=True)
+        mkinitcpio = tmp_path / "etc/mkinitcpio.conf"
+        mkinitcpio.write_text("MODULES=(btrfs)\nHOOKS=(base udev)\n")
+        grub = tmp_path / "etc/default/grub"
+        grub.write_text('GRUB_CMDLINE_LINUX_DEFAULT="quiet"\n')
+
+        generator = ConfigGenerator()
+        generator._update_mkinitcpio(
+            mkinitcpio, "MODULES=(vfio_pci vfio vfio_iommu_type1)", dry_run=False
+        )
+        generator._update_grub(tmp_path, "intel_iommu=on iommu=pt", dry_run=False)
+
+        assert mkinitcpio.read_text() == (
+            "MODULES=(vfio_pci vfio vfio_iommu_type1)\nHOOKS=(base udev)\n"
+        )
+        assert grub.read_text() == (
+            'GRUB_CMDLINE_LINUX_DEFAULT="quiet intel_iommu=on iommu=pt"\n'
+        )
+
+    @patch("subprocess.Popen")
+    def test_update_grub_regenerates_in_background(self, mock_popen, tmp_path):
+        """Test grub-mkconfig is started by _update_grub and awaited separately."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        (tmp_path / "etc/default").mkdir(parents=True)
+        (tmp_path / "etc/default/grub").write_text('GRUB_CMDLINE_LINUX_DEFAULT="quiet"\n')
+        (tmp_path / "boot/grub").mkdir(parents=True)
+        (tmp_path / "boot/grub/grub.cfg").write_text("# GRUB config\n")
+
+        process = mock_popen.return_value
+        process.args = ["grub-mkconfig", "-o", str(tmp_path / "boot/grub/grub.cfg")]
+        process.returncode = 0
+
+        generator = ConfigGenerator()
+        result = generator._update_grub(tmp_path, "intel_iommu=on iommu=pt", dry_run=False)
+
+        assert result is process
+        process.communicate.assert_not_called()
+
+        generator._wait_grub_mkconfig(result)
+        process.communicate.assert_called_once()
+
+    def test_apply_waits_for_grub_before_initramfs(self):
+        """Test grub-mkconfig finishes before mkinitcpio rewrites /boot."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        generator = ConfigGenerator()
+        calls = []
+        process = MagicMock()
+        config = MagicMock(is_valid=True, bootloader="grub", warnings=[])
+
+        with patch.object(generator, "detect_and_generate", return_value=config), \
+             patch.object(generator, "_update_grub", return_value=process), \
+             patch.object(generator, "_write_file"), \
+             patch.object(generator, "_update_mkinitcpio"), \
+             patch.object(generator, "_wait_grub_mkconfig",
+                          side_effect=lambda p: calls.append("grub")), \
+             patch.object(generator, "_regenerate_initramfs",
+                          side_effect=lambda: calls.append("initramfs")):
+            assert generator.apply_to_target(Path("/")) is True
+
+        assert calls == ["grub", "initramfs"]
+
+    def test_apply_reaps_grub_on_error(self):
+        """Test grub-mkconfig is waited on even if a config write fails."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        generator = ConfigGenerator()
+        process = MagicMock()
+        config = MagicMock(is_valid=True, bootloader="grub", warnings=[])
+
+        with patch.object(generator, "detect_and_generate", return_value=config), \
+             patch.object(generator, "_update_grub", return_value=process), \
+             patch.object(generator, "_write_file", side_effect=PermissionError), \
+             patch.object(generator, "_wait_grub_mkconfig") as mock_wait:
+            with pytest.raises(PermissionError):
+                generator.apply_to_target(Path("/mnt"))
+
+        mock_wait.assert_called_once_with(process)
+
+    def test_update_systemd_boot(self, tmp_path):
+        """Test kernel params are appended to systemd-boot options lines."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        entries = tmp_path / "boot/loader/entries"
+        entries.mkdir(parents=True)
+        entry = entries / "arch.conf"
+        entry.write_text(
+            "title Arch Linux\n"
+            "linux /vmlinuz-linux\n"
+            "options root=/dev/sda2 rw\n"
+        )
+
+        ConfigGenerator()._update_systemd_boot(tmp_path, "amd_iommu=on iommu=pt", dry_run=False)
+
+        assert entry.read_text() == (
+            "title Arch Linux\n"
+            "linux /vmlinuz-linux\n"
+            "options root=/dev/sda2 rw amd_iommu=on iommu=pt\n"
+        )
+
+    def test_get_vfio_ids_dedupes_in_order(self):
+        """Test VFIO IDs keep the GPU first and drop duplicates."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        gpu = MagicMock(pci_address="01:00.0", vfio_ids="10de:2484")
+        group = MagicMock(passthrough_devices=[
+            MagicMock(pci_address="01:00.0", vfio_ids="10de:2484"),
+            MagicMock(pci_address="01:00.1", vfio_ids="10de:228b"),
+            MagicMock(pci_address="01:00.2", vfio_ids="10de:228b"),
+            MagicMock(pci_address="01:00.3", vfio_ids="10de:1aec"),
+        ])
+
+        ids = ConfigGenerator()._get_vfio_ids(gpu, group)
+
+        assert ids == ["10de:2484", "10de:228b", "10de:1aec"]
+
+    def test_apply_to_target(self, tmp_path):
+        """Test applying a config writes vfio.conf and updates the target."""
+        from hardware_detect.config_generator import ConfigGenerator, VFIOConfig
+
+        (tmp_path / "etc").mkdir()
+        (tmp_path / "etc/mkinitcpio.conf").write_text("MODULES=()\n")
+        entries = tmp_path / "boot/loader/entries"
+        entries.mkdir(parents=True)
+        (entries / "arch.conf").write_text("options root=/dev/sda2\n")
+
+        gpu = MagicMock(pci_address="01:00.0", vfio_ids="10de:2484")
+        config = VFIOConfig(
+            vfio_conf="options vfio-pci ids=10de:2484\n",
+            mkinitcpio_modules="MODULES=(vfio_pci vfio vfio_iommu_type1)",
+            kernel_params="intel_iommu=on iommu=pt",
+            bootloader="systemd-boot",
+            passthrough_gpu=gpu,
+            boot_gpu=None,
+        )
+
+        generator = ConfigGenerator()
+        with patch.object(generator, "detect_and_generate", return_value=config):
+            assert generator.apply_to_target(tmp_path) is True
+
+        assert (tmp_path / "etc/modprobe.d/vfio.conf").read_text() == config.vfio_conf
+        assert (tmp_path / "etc/mkinitcpio.conf").read_text() == (
+            "MODULES=(vfio_pci vfio vfio_iommu_type1)\n"
+        )
+        assert (entries / "arch.conf").read_text() == (
+            "options root=/dev/sda2 intel_iommu=on iommu=pt\n"
+        )
+
+    def test_generate_vfio_conf(self):
+        """Test vfio.conf content for a GPU and its group members."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        gpu = MagicMock(pci_address="01:00.0", vendor_name="NVIDIA Corporation",
+                        device_name="GA106 [GeForce RTX 3060]")
+        content = ConfigGenerator()._generate_vfio_conf(["10de:2503", "10de:228e"], gpu)
+
+        assert content.startswith("# NeuronOS VFIO Configuration\n")
+        assert "# Target GPU: NVIDIA Corporation GA106 [GeForce RTX 3060]\n" in content
+        assert "# PCI Address: 01:00.0\n" in content
+        assert "\noptions vfio-pci ids=10de:2503,10de:228e\n" in content
+        assert "softdep nvidia pre: vfio-pci\n" in content
+
+    def test_detect_and_generate_caches_probes(self):
+        """Test that hardware probes run once until refresh() is called."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        generator = ConfigGenerator()
+        cpu = MagicMock(has_virtualization=True, iommu_enabled=True,
+                        iommu_param="intel_iommu=on iommu=pt")
+
+        with patch.object(generator.cpu_detector, "detect", return_value=cpu) as detect, \
+                patch.object(generator.scanner, "scan", return_value=[]) as scan, \
+                patch.object(generator.iommu_parser, "parse_all", return_value={}) as parse_all:
+            generator.detect_and_generate()
+            config = generator.detect_and_generate()
+            assert detect.call_count == 1
+            assert scan.call_count == 1
+            assert config.errors
+
+            generator.refresh()
+            generator.detect_and_generate()
+            assert detect.call_count == 2
+            assert scan.call_count == 2
+            # No GPU, so the IOMMU groups were never needed
+            parse_all.assert_not_called()
+
+    def test_detect_and_generate_reuses_config_until_key_changes(self):
+        """Test the generated config is reused while the system looks unchanged."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        generator = ConfigGenerator()
+        cpu = MagicMock(has_virtualization=True, iommu_enabled=True,
+                        iommu_param="intel_iommu=on iommu=pt")
+
+        with patch.object(generator.cpu_detector, "detect", return_value=cpu) as detect, \
+                patch.object(generator.scanner, "scan", return_value=[]), \
+                patch.object(generator.iommu_parser, "parse_all", return_value={}), \
+                patch.object(generator, "_config_cache_key", return_value=(1, 4)) as key:
+            first = generator.detect_and_generate()
+            assert generator.detect_and_generate() is first
+            assert detect.call_count == 1
+
+            key.return_value = (2, 4)
+            assert generator.detect_and_generate() is not first
+            assert detect.call_count == 2
+
+    def test_iommu_not_probed_without_passthrough_gpu(self):
+        """Test the IOMMU walk is skipped when no GPU can be passed through."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        cpu = MagicMock(has_virtualization=True, iommu_enabled=True,
+                        iommu_param="intel_iommu=on iommu=pt")
+        gpu = MagicMock(pci_address="00:02.0", vfio_ids="8086:3e92")
+
+        for gpus, candidate in (([], None), ([gpu], None)):
+            generator = ConfigGenerator()
+            with patch.object(generator.cpu_detector, "detect", return_value=cpu), \
+                    patch.object(generator.scanner, "scan", return_value=gpus), \
+                    patch.object(generator.scanner, "get_passthrough_candidate",
+                                 return_value=candidate), \
+                    patch.object(generator.scanner, "get_boot_gpu", return_value=None), \
+                    patch.object(generator.iommu_parser, "parse_all", return_value={}) as parse_all:
+                config = generator.detect_and_generate()
+
+            assert parse_all.call_count == 0
+            assert config.passthrough_gpu is None
+            assert config.errors
+
+    def test_probe_failure_surfaces_at_call_site(self):
+        """Test a probe failing in the thread pool is raised in order, not re-run."""
+        from hardware_detect.config_generator import ConfigGenerator
+
+        generator = ConfigGenerator()
+        cpu = MagicMock(has_virtualization=True, iommu_enabled=True,
+                        iommu_param="intel_iommu=on iommu=pt")
+        gpu = MagicMock(pci_address="01:00.0", vfio_ids="10de:2484",
+                        vendor_name="NVIDIA", device_name="RTX 3060")
+
+        with patch.object(generator.cpu_detector, "detect", return_value=cpu), \
+                patch.object(generator.scanner, "scan", return_value=[gpu, gpu]), \
+                patch.object(generator.scanner, "get_passthrough_candidate", return_value=gpu), \
+                patch.object(generator.scanner, "get_boot_gpu", return_value=None), \
+                patch.object(generator.iommu_parser, "parse_all",
+                             side_effect=RuntimeError("IOMMU not enabled")) as parse_all:
+            config = generator.detect_and_generate()
+
+        parse_all.assert_called_once()
+        assert "IOMMU not enabled" in config.warnings
+        assert config.passthrough_gpu is gpu
+        assert "10de:2484" in config.vfio_conf
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,290 @@
+"""
+Tests for NeuronOS migration drive detection and CLI helpers.
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from migration.drive_detector import DetectedDrive, DriveDetector, DriveType
+
+
+def make_drive(mount: Path) -> DetectedDrive:
+    return DetectedDrive(
+        device="/dev/sdb1",
+        mount_point=mount,
+        label="test",
+        filesystem="ntfs",
+        size_bytes=0,
+        drive_type=DriveType.UNKNOWN,
+    )
+
+
+def make_dirs(root: Path, *paths: str) -> None:
+    for path in paths:
+        (root / path).mkdir(parents=True, exist_ok=True)
+
+
+class TestDriveIdentification:
+    """Tests for identifying drive types and user accounts."""
+
+    def test_windows_drive(self, tmp_path):
+        """Test a Windows install is detected with its real user accounts."""
+        make_dirs(
+            tmp_path,
+            "Windows/System32",
+            "Users/alice/Documents",
+            "Users/bob/AppData",
+            "Users/Public/Documents",
+            "Users/Default/Desktop",
+            "Users/empty",
+        )
+        (tmp_path / "Users" / "desktop.ini").touch()
+
+        drive = make_drive(tmp_path)
+        DriveDetector()._identify_drive(drive)
+
+        assert drive.drive_type == DriveType.WINDOWS
+        assert sorted(drive.users) == ["alice", "bob"]
+        assert drive.is_system_drive is True
+
+    def test_macos_drive(self, tmp_path):
+        """Test a macOS install is detected, skipping shared and hidden accounts."""
+        make_dirs(
+            tmp_path,
+            "Applications",
+            "Users/carol/Library",
+            "Users/Shared/Documents",
+            "Users/.hidden/Documents",
+        )
+
+        drive = make_drive(tmp_path)
+        DriveDetector()._identify_drive(drive)
+
+        assert drive.drive_type == DriveType.MACOS
+        assert drive.users == ["carol"]
+        assert drive.is_system_drive is False
+
+        make_dirs(tmp_path, "System")
+        DriveDetector()._identify_drive(drive)
+        assert drive.is_system_drive is True
+
+    def test_linux_drive(self, tmp_path):
+        """Test a Linux install lists home directories as users."""
+        make_dirs(tmp_path, "etc", "home/dave", "home/.snapshots")
+
+        drive = make_drive(tmp_path)
+        DriveDetector()._identify_drive(drive)
+
+        assert drive.drive_type == DriveType.LINUX
+        assert drive.users == ["dave"]
+
+    def test_data_drive(self, tmp_path):
+        """Test a drive without an OS layout is a data drive."""
+        make_dirs(tmp_path, "Photos")
+
+        drive = make_drive(tmp_path)
+        DriveDetector()._identify_drive(drive)
+
+        assert drive.drive_type == DriveType.DATA
+        assert drive.users == []
+
+
+class TestDriveDetectorScan:
+    """Tests for DriveDetector.scan()."""
+
+    def test_scan_identifies_mounted_partitions(self, tmp_path):
+        """Test every mounted partition from lsblk is identified without sysfs."""
+        windows = tmp_path / "windows"
+        make_dirs(windows, "Windows", "Users/alice/Documents")
+        linux = tmp_path / "linux"
+        make_dirs(linux, "etc", "home/dave")
+        data = tmp_path / "data"
+        make_dirs(data, "Photos")
+
+        lsblk = {"blockdevices": [
+            {"name": "sda", "type": "disk", "size": "1T", "children": [
+                {"name": "sda1", "type": "part", "size": "500G",
+                 "mountpoint": str(windows), "fstype": "ntfs", "label": "C"},
+                {"name": "sda2", "type": "part", "size": "200G",
+                 "mountpoint": str(linux), "fstype": "ext4", "label": None},
+                {"name": "sda3", "type": "part", "size": "100G",
+                 "mountpoint": None, "fstype": "swap", "label": None},
+            ]},
+            {"name": "sdb1", "type": "part", "size": "2T",
+             "mountpoint": str(data), "fstype": "exfat", "label": "Backup"},
+        ]}
+
+        with patch.object(DriveDetector, "SYS_BLOCK_PATH", str(tmp_path / "missing")), \
+             patch("subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stdout=json.dumps(lsblk))
+            drives = DriveDetector().scan()
+
+        by_device = {d.device: d for d in drives}
+        assert sorted(by_device) == ["/dev/sda1", "/dev/sda2", "/dev/sdb1"]
+        assert by_device["/dev/sda1"].drive_type == DriveType.WINDOWS
+        assert by_device["/dev/sda1"].users == ["alice"]
+        assert by_device["/dev/sda1"].size_bytes == 500 * 1024 ** 3
+        assert by_device["/dev/sda2"].drive_type == DriveType.LINUX
+        assert by_device["/dev/sda2"].label == "sda2"
+        assert by_device["/dev/sdb1"].drive_type == DriveType.DATA
+
+    def test_parse_size(self):
+        """Test lsblk size strings are converted to bytes."""
+        detector = DriveDetector()
+
+        assert detector._parse_size("500G") == 500 * 1024 ** 3
+        assert detector._parse_size(" 1.5t") == int(1.5 * 1024 ** 4)
+        assert detector._parse_size("512") == 512
+        assert detector._parse_size("") == 0
+        assert detector._parse_size("  ") == 0
+        assert detector._parse_size("G") == 0
+        assert detector._parse_size("12X") == 0
+
+    def test_scan_reads_sysfs(self, tmp_path):
+        """Test mounted partitions are found from sysfs and the mount table."""
+        windows = tmp_path / "win c"
+        make_dirs(windows, "Windows", "Users/alice/Documents")
+
+        sys_block = tmp_path / "sys"
+        for name, dev, sectors, partition in [
+            ("sda", "8:0", "2097152", False),
+            ("sda1", "8:1", "1048576", True),
+            ("sda2", "8:2", "4096", True),
+        ]:
+            make_dirs(sys_block, name)
+            (sys_block / name / "dev").write_text(dev + "\n")
+            (sys_block / name / "size").write_text(sectors + "\n")
+            if partition:
+                (sys_block / name / "partition").write_text("1\n")
+
+        udev = tmp_path / "udev"
+        udev.mkdir()
+        (udev / "b8:1").write_text(
+            "S:disk/by-label/Windows\\x20C\n"
+            "E:ID_FS_TYPE=ntfs\n"
+            "E:ID_FS_LABEL=Windows_C\n"
+            "E:ID_FS_LABEL_ENC=Windows\\x20C\n"
+        )
+
+        mounts = tmp_path / "mounts"
+        escaped = str(windows).replace(" ", "\\040")
+        mounts.write_text(
+            f"/dev/sda1 {escaped} fuseblk rw 0 0\n"
+            f"/dev/sda1 /mnt/bind fuseblk rw 0 0\n"
+            f"/dev/sda2 {tmp_path}/missing ext4 rw 0 0\n"
+            f"/dev/sda {tmp_path} ext4 rw 0 0\n"
+            "tmpfs /tmp tmpfs rw 0 0\n"
+        )
+
+        with patch.object(DriveDetector, "SYS_BLOCK_PATH", str(sys_block)), \
+             patch.object(DriveDetector, "MOUNTS_PATH", str(mounts)), \
+             patch.object(DriveDetector, "UDEV_DATA_PATH", str(udev)), \
+             patch("subprocess.run") as mock_run:
+            drives = DriveDetector().scan()
+
+        mock_run.assert_not_called()
+        by_device = {d.device: d for d in drives}
+        assert sorted(by_device) == ["/dev/sda1", "/dev/sda2"]
+        assert by_device["/dev/sda1"].mount_point == windows
+        assert by_device["/dev/sda1"].label == "Windows C"
+        assert by_device["/dev/sda1"].filesystem == "ntfs"
+        assert by_device["/dev/sda1"].size_bytes == 512 * 1024 ** 2
+        assert by_device["/dev/sda1"].drive_type == DriveType.WINDOWS
+        assert by_device["/dev/sda2"].label == "sda2"
+        assert by_device["/dev/sda2"].filesystem == "ext4"
+        assert by_device["/dev/sda2"].size_bytes == 4096 * 512
+
+
+class TestMigrationCLI:
+    """Tests for the neuron-migrate command handlers."""
+
+    def test_format_size(self):
+        """Test sizes are shown in the largest unit below 1024."""
+        from migration.cli import format_size
+
+        assert format_size(0) == "0.0 B"
+        assert format_size(1023) == "1023.0 B"
+        assert format_size(1024) == "1.0 KB"
+        assert format_size(1536) == "1.5 KB"
+        assert format_size(5 * 1024 ** 3) == "5.0 GB"
+        assert format_size(3 * 1024 ** 5) == "3.0 PB"
+        assert format_size(2048 * 1024 ** 5) == "2048.0 PB"
+
+    def test_progress_callback_throttled(self, capsys, monkeypatch):
+        """Test progress redraws are throttled except for completion."""
+        from migration import cli
+        from migration.migrator import MigrationProgress
+
+        clock = iter([100.0, 100.01, 100.02, 100.1, 100.11])
+        monkeypatch.setattr(cli.time, "monotonic", lambda: next(clock))
+        monkeypatch.setattr(cli, "_last_progress_update", 0.0)
+
+        progress = MigrationProgress(files_total=4, bytes_total=100)
+        for done in (10, 20, 100, 100):
+            progress.files_done += 1
+            progress.bytes_done = done
+            cli.progress_callback(progress)
+
+        lines = capsys.readouterr().out.split("\r")[1:]
+        assert len(lines) == 3
+        assert lines[0].startswith("[====----")
+        assert "(1/4)" in lines[0]
+        assert lines[1].startswith("[" + "=" * 40 + "] 100.0% (3/4)")
+
+        progress.bytes_done = 150
+        cli.progress_callback(progress)
+        assert capsys.readouterr().out.startswith("\r[" + "=" * 40 + "] 150.0%")
+
+    def test_cmd_migrate_detects_type_without_scanning(self, tmp_path, capsys):
+        """Test the OS type comes from the user folder, not a drive scan."""
+        from argparse import Namespace
+        from migration.cli import cmd_migrate
+
+        source = tmp_path / "alice"
+        make_dirs(source, "AppData")
+        args = Namespace(source=str(source), target=str(tmp_path / "home"),
+                         type=None, categories=None, yes=True)
+
+        with patch.object(DriveDetector, "scan") as mock_scan:
+            assert cmd_migrate(args) == 0
+
+        mock_scan.assert_not_called()
+        out = capsys.readouterr().out
+        assert "Migration: Windows -> NeuronOS" in out
+        assert "No files to migrate." in out
+
+    def test_cmd_scan_groups_drives(self, capsys):
+        """Test scan output lists OS installs and, with --all, other drives."""
+        from argparse import Namespace
+        from migration.cli import cmd_scan
+
+        windows = make_drive(Path("/mnt/c"))
+        windows.drive_type = DriveType.WINDOWS
+        windows.users = ["alice"]
+        data = make_drive(Path("/mnt/d"))
+        data.device = "/dev/sdc1"
+        data.drive_type = DriveType.DATA
+
+        with patch.object(DriveDetector, "scan", return_value=[data, windows]):
+            assert cmd_scan(Namespace(all=True)) == 0
+
+        out = capsys.readouterr().out
+        assert "Windows Installations:" in out
+        assert "Users: alice" in out
+        assert "macOS Installations:" not in out
+        assert "Other Drives:" in out
+        assert "/dev/sdc1" in out
+
+        with patch.object(DriveDetector, "scan", return_value=[data]):
+            assert cmd_scan(Namespace(all=False)) == 1
+        assert "No Windows or macOS installations found." in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])